@@ -5,7 +5,7 @@ from typing import Self
 from . import MessageType, MessageBase
 
 
-@dataclass
+@dataclass(slots=True)
 class GenericMessage(MessageBase):
     """Generic Message"""
 
@@ -22,8 +22,21 @@ class GenericMessage(MessageBase):
             Self: Generic Message
         """
 
-        message_type, payload = MessageBase._read_common(stream)
-        return cls(message_type, payload)
+        return cls.from_bytes(MessageBase._read_frame(stream))
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes | memoryview) -> Self:
+        """From bytes
+
+        Args:
+            buffer (bytes | memoryview): Complete message including header
+
+        Returns:
+            Self: Generic Message
+        """
+
+        _, payload, _ = MessageBase._read_common(buffer)
+        return cls(bytes(payload))
 
     def _message_type(self) -> MessageType:
         return MessageType.UNDEFINED
@@ -1,12 +1,14 @@
 from dataclasses import dataclass
 from io import BufferedReader
+import struct
 from typing import Self
 
-from bitstring import BitStream, pack
-
 from . import MessageBase, MessageType
 
-@dataclass
+_FMT = struct.Struct("8s")
+
+
+@dataclass(slots=True)
 class GetTerminalTypeRequest(MessageBase):
     denmoku_serial: str
 
@@ -18,24 +20,33 @@ class GetTerminalTypeRequest(MessageBase):
             stream (BufferedReader): Input stream
 
         Returns:
-            Self: GetTerminalTypeResponse
+            Self: GetTerminalTypeRequest
+        """
+
+        return cls.from_bytes(MessageBase._read_frame(stream))
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes | memoryview) -> Self:
+        """From bytes
+
+        Args:
+            buffer (bytes | memoryview): Complete message including header
+
+        Returns:
+            Self: GetTerminalTypeRequest
         """
 
-        message_type, payload = MessageBase._read_common(stream)
+        message_type, payload, _ = MessageBase._read_common(buffer)
 
         if message_type != MessageType.GET_TERMINAL_TYPE_REQUEST:
             raise ValueError("Message type mismatch.")
 
-        stream = BitStream(payload)
-        denmoku_serial = stream.read("bytes:8").decode("ascii")
+        (denmoku_serial,) = _FMT.unpack_from(payload)
 
-        return cls(denmoku_serial)
+        return cls(denmoku_serial.decode("ascii"))
 
     def _message_type(self) -> MessageType:
         return MessageType.GET_TERMINAL_TYPE_REQUEST
 
     def _payload_buffer(self) -> bytes:
-        return pack(
-            "bytes:8",
-            self.denmoku_serial.encode("ascii"),
-        ).tobytes()
+        return _FMT.pack(self.denmoku_serial.encode("ascii"))
@@ -1,13 +1,16 @@
 from dataclasses import dataclass
 from io import BufferedReader
+import struct
 from typing import Self
 
-from bitstring import BitStream, pack
-
 from . import MessageType, MessageBase
 
+# protocol_version, model_id, model_sub_id, serial, software_version,
+# bb_index, reserved, printer_version, reserved
+_FMT = struct.Struct(">I2s2s8s8sH2s4s4x")
+
 
-@dataclass
+@dataclass(slots=True)
 class GetTerminalTypeResponse(MessageBase):
     protocol_version: int
     model_id: str
@@ -28,32 +31,43 @@ class GetTerminalTypeResponse(MessageBase):
             Self: GetTerminalTypeResponse
         """
 
-        message_type, payload = MessageBase._read_common(stream)
+        return cls.from_bytes(MessageBase._read_frame(stream))
+
+    @classmethod
+    def from_bytes(cls, buffer: bytes | memoryview) -> Self:
+        """From bytes
+
+        Args:
+            buffer (bytes | memoryview): Complete message including header
+
+        Returns:
+            Self: GetTerminalTypeResponse
+        """
+
+        message_type, payload, _ = MessageBase._read_common(buffer)
 
         if message_type != MessageType.GET_TERMINAL_TYPE_RESPONSE:
             raise ValueError("Message type mismatch.")
 
-        stream = BitStream(payload)
-        protocol_version = stream.read("uintbe:32")
-        model_id = stream.read("bytes:2").decode("ascii")
-        model_sub_id = stream.read("bytes:2").decode("ascii")
-        serial = stream.read("bytes:8").decode("ascii")
-        software_version = stream.read("bytes:8").decode("ascii")
-        bb_index = stream.read("uintbe:16")
-        # Reserved
-        stream.read("bytes:2")
-        printer_version = stream.read("bytes:4").decode("ascii")
-        # Reserved
-        stream.read("bytes:4")
-
-        return cls(
+        (
             protocol_version,
             model_id,
             model_sub_id,
             serial,
             software_version,
             bb_index,
+            _,
             printer_version,
+        ) = _FMT.unpack_from(payload)
+
+        return cls(
+            protocol_version,
+            model_id.decode("ascii"),
+            model_sub_id.decode("ascii"),
+            serial.decode("ascii"),
+            software_version.decode("ascii"),
+            bb_index,
+            printer_version.decode("ascii"),
         )
 
     def _message_type(self) -> MessageType:
@@ -66,13 +80,13 @@ class GetTerminalTypeResponse(MessageBase):
             bytes: Payload Buffer
         """
 
-        return pack(
-            "uintbe:32, bytes:2, bytes:2, bytes:8, bytes:8, uintbe:16, pad:16, bytes:4, uintbe:32",
+        return _FMT.pack(
             self.protocol_version,
             self.model_id.encode("ascii"),
             self.model_sub_id.encode("ascii"),
             self.serial.encode("ascii"),
             self.software_version.encode("ascii"),
             self.bb_index,
+            b"\x00\x00",
             self.printer_version.encode("ascii"),
-        ).tobytes()
+        )
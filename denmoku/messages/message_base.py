@@ -1,34 +1,71 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from io import BufferedReader, BufferedWriter, BytesIO
-import os
+from io import BufferedReader, BufferedWriter
+import struct
 
 from . import MessageType
 
+# Message type, payload size
+_HEADER = struct.Struct(">HH")
 
-@dataclass
+# Raw message type values, checked without the IntEnum lookup
+_KNOWN_TYPES: frozenset[int] = frozenset(MessageType._value2member_map_)
+
+
+@dataclass(slots=True)
 class MessageBase(ABC):
     """Chunk Base Class"""
 
     @staticmethod
-    def _read_common(stream: BufferedReader) -> tuple[MessageType, bytes]:
+    def _read_common(
+        buffer: bytes | memoryview, offset: int = 0
+    ) -> tuple[int, memoryview, int]:
         """Read Common Part
 
+        Args:
+            buffer (bytes | memoryview): Input buffer
+            offset (int): Offset of the message in the buffer
+
+        Returns:
+            tuple[int, memoryview, int]: Raw message type, Payload and
+                offset of the next message
+        """
+
+        if len(buffer) - offset < _HEADER.size:
+            raise ValueError("Reached to End of File.")
+        message_type, size = _HEADER.unpack_from(buffer, offset)
+        if message_type not in _KNOWN_TYPES:
+            raise ValueError(f"Unknown message type: 0x{message_type:04x}")
+
+        payload_offset = offset + _HEADER.size
+        next_offset = payload_offset + size
+        if len(buffer) < next_offset:
+            raise ValueError("Reached to End of File.")
+        return (
+            message_type,
+            memoryview(buffer)[payload_offset:next_offset],
+            next_offset,
+        )
+
+    @staticmethod
+    def _read_frame(stream: BufferedReader) -> bytes:
+        """Read one complete message from a stream
+
         Args:
             stream (BufferedReader): Input stream
 
         Returns:
-            tuple[MessageType, bytes]: MessageType and Payload
+            bytes: Message including header
         """
 
-        buffer = stream.read(4)
-        if len(buffer) < 4:
-            stream.seek(-len(buffer), os.SEEK_CUR)
+        header = stream.read(_HEADER.size)
+        if len(header) < _HEADER.size:
             raise ValueError("Reached to End of File.")
-        message_type = MessageType(int.from_bytes(buffer[0:2], "big"))
-        size = int.from_bytes(buffer[2:4], "big")
+        _, size = _HEADER.unpack(header)
         payload = stream.read(size)
-        return message_type, payload
+        if len(payload) < size:
+            raise ValueError("Reached to End of File.")
+        return header + payload
 
     @abstractmethod
     def _message_type(self) -> MessageType:
@@ -57,11 +94,7 @@ class MessageBase(ABC):
             stream (BufferedReader): Output stream
         """
 
-        payload_buffer = self._payload_buffer()
-
-        stream.write(self._message_type().value.to_bytes(2, "big"))
-        stream.write(len(payload_buffer).to_bytes(2, "big"))
-        stream.write(payload_buffer)
+        stream.write(self.to_bytes())
 
     def to_bytes(self) -> bytes:
         """To bytes
@@ -70,7 +103,5 @@ class MessageBase(ABC):
             bytes: This instance as a bytes
         """
 
-        stream = BytesIO()
-        self.write(stream)
-        stream.seek(0)
-        return stream.read()
+        payload_buffer = self._payload_buffer()
+        return _HEADER.pack(self._message_type(), len(payload_buffer)) + payload_buffer
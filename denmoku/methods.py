@@ -1,23 +1,44 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
 from contextlib import contextmanager
+import errno
 from dataclasses import dataclass
-from io import BytesIO
 from ipaddress import IPv4Network
 from logging import getLogger
 from typing import Final, Iterator, TypeAlias
 import socket
-import threading
+import struct
 
 from tqdm import tqdm
 
 from .messages import GetTerminalTypeRequest, GetTerminalTypeResponse
 
-ResponseBuffer: TypeAlias = bytes
+# The open file limit is only adjustable where the resource module exists
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ResponseBuffer: TypeAlias = memoryview
 Address: TypeAlias = str
+PackedAddress: TypeAlias = int
 ScanResult: TypeAlias = tuple[Address, ResponseBuffer | None]
 
 logger = getLogger(__name__)
 
+# The scan request never changes, so it is serialized once
+REQUEST_BUFFER: Final[bytes] = GetTerminalTypeRequest("SPDENMOK").to_bytes()
+
+RESULT_FORMAT: Final[str] = (
+    "%s: "
+    "protocol_version=%d "
+    "model_id=%s "
+    "model_sub_id=%s "
+    "serial=%s "
+    "software_version=%s "
+    "bb_index=%d "
+    "printer_version=%s"
+)
+
 
 class NetworkConstants:
     """Network-related constants"""
@@ -25,7 +46,13 @@ class NetworkConstants:
     DEFAULT_PORT: Final[int] = 22960
     DEFAULT_BUFFER_SIZE: Final[int] = 4096
     DEFAULT_TIMEOUT: Final[float] = 5.0
-    DEFAULT_MAX_WORKERS: Final[int] = 255
+    DEFAULT_MAX_WORKERS: Final[int] = 1000
+    MAX_WORKERS: Final[int] = 2000
+    # File descriptors kept free for everything other than probe sockets
+    RESERVED_FDS: Final[int] = 64
+    # Multicast (224.0.0.0/4) and reserved (240.0.0.0/4) addresses are never
+    # scanned, and both ranges sit at the top of the address space.
+    SCANNABLE_ADDRESS_END: Final[int] = 0xE0000000
 
 
 class NetworkError(Exception):
@@ -65,29 +92,69 @@ class NetworkConfig:
             raise ValueError(f"Invalid port number: {self.port}")
         if not 0 < self.timeout:
             raise ValueError(f"Invalid timeout: {self.timeout}")
-        if not 0 < self.max_workers <= 1000:
+        if not 0 < self.max_workers <= NetworkConstants.MAX_WORKERS:
             raise ValueError(f"Invalid number of workers: {self.max_workers}")
 
 
-class ThreadLocalSocket:
-    """Thread-local socket management"""
+# Message type, payload size
+_MESSAGE_HEADER: Final[struct.Struct] = struct.Struct(">HH")
+
+_LINGER_ABORT: Final[bytes] = struct.pack("ii", 1, 0)
+
+# Errors meaning this process is out of file descriptors, not that the
+# probed host failed to respond
+_FD_EXHAUSTED: Final[frozenset[int]] = frozenset((errno.EMFILE, errno.ENFILE))
+
 
-    _local = threading.local()
+def usable_workers(wanted: int) -> int:
+    """Get how many probes can hold a socket at once
 
-    @classmethod
-    @contextmanager
-    def get_socket(cls, timeout: float) -> Iterator[socket.socket]:
-        """Get or create a thread-local socket with context management"""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
+    The soft open file limit is raised towards the hard limit if it is too
+    low for `wanted` probes, and the worker count is clamped to what the
+    limit allows.
 
+    Args:
+        wanted: Requested number of concurrent probes
+
+    Returns:
+        Number of concurrent probes that fit in the open file limit
+    """
+    if resource is None:
+        return wanted
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = wanted + NetworkConstants.RESERVED_FDS
+    if soft != resource.RLIM_INFINITY and soft < needed:
+        target = needed if hard == resource.RLIM_INFINITY else min(needed, hard)
         try:
-            yield sock
-        finally:
-            try:
-                sock.close()
-            except Exception as e:
-                logger.debug(f"Error closing socket: {e}")
+            resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+            soft = target
+        except (ValueError, OSError) as e:
+            logger.debug(f"Failed to raise open file limit to {target}: {e}")
+
+    if soft == resource.RLIM_INFINITY:
+        return wanted
+    return max(1, min(wanted, soft - NetworkConstants.RESERVED_FDS))
+
+
+@contextmanager
+def open_socket() -> Iterator[socket.socket]:
+    """Create a non-blocking TCP socket that is closed on exit"""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    # The request is a single small message, so send it without Nagle delay
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    # Abort on close: a scan never needs a graceful shutdown, and skipping it
+    # keeps closed probes from holding ports in TIME_WAIT
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, _LINGER_ABORT)
+
+    try:
+        yield sock
+    finally:
+        try:
+            sock.close()
+        except Exception as e:
+            logger.debug(f"Error closing socket: {e}")
 
 
 class NetworkScanner:
@@ -105,29 +172,90 @@ class NetworkScanner:
         except ValueError as e:
             raise ValueError(f"Invalid configuration: {e}")
 
-    def send_message(self, remote_address: Address, message: bytes) -> ScanResult:
+    async def send_message(
+        self,
+        remote_address: Address,
+        message: bytes,
+        buffer: bytearray | None = None,
+    ) -> ScanResult:
         """Send message to remote address and return response
 
         Args:
             remote_address: Target IP address
             message: Message to send
+            buffer: Receive buffer to reuse, allocated if None. The returned
+                response is a view into it and is only valid until the
+                buffer is reused.
 
         Returns:
             Tuple of (address, response_buffer or None)
-
-        Raises:
-            ConnectionError: If connection fails
         """
+        loop = asyncio.get_running_loop()
+        if buffer is None:
+            buffer = bytearray(self.config.buffer_size)
         try:
-            with ThreadLocalSocket.get_socket(self.config.timeout) as sock:
-                sock.connect((remote_address, self.config.port))
-                sock.send(message)
-                received = sock.recv(self.config.buffer_size)
-                return remote_address, received
+            # The socket is driven directly by the event loop's selector, and
+            # a single deadline covers the whole exchange.
+            with open_socket() as sock:
+                async with asyncio.timeout(self.config.timeout):
+                    await loop.sock_connect(sock, (remote_address, self.config.port))
+                    await loop.sock_sendall(sock, message)
+                    received = await self.receive_message(sock, buffer)
+            return remote_address, received
         except Exception as e:
+            # Running out of sockets says nothing about the host, so it must
+            # not be reported as a host that did not respond
+            if isinstance(e, OSError) and e.errno in _FD_EXHAUSTED:
+                raise
             logger.debug(f"Failed to communicate with {remote_address}: {e}")
             return remote_address, None
 
+    async def receive_message(
+        self, sock: socket.socket, buffer: bytearray
+    ) -> ResponseBuffer:
+        """Receive exactly one framed message from a connected socket
+
+        Args:
+            sock: Connected non-blocking socket
+            buffer: Buffer the message is received into
+
+        Returns:
+            View of the message in `buffer`, including its header
+
+        Raises:
+            ResponseError: If the peer closes early or the message is too large
+        """
+        loop = asyncio.get_running_loop()
+        view = memoryview(buffer)
+
+        header_size = _MESSAGE_HEADER.size
+        await self._recv_exactly(loop, sock, view[:header_size])
+        _, size = _MESSAGE_HEADER.unpack_from(view)
+        end = header_size + size
+        if end > len(buffer):
+            raise ResponseError(f"Message too large: {size} bytes")
+        await self._recv_exactly(loop, sock, view[header_size:end])
+        return view[:end]
+
+    @staticmethod
+    async def _recv_exactly(
+        loop: asyncio.AbstractEventLoop, sock: socket.socket, view: memoryview
+    ) -> None:
+        """Fill `view` with bytes received from a socket
+
+        Raises:
+            ResponseError: If the peer closes the connection early
+        """
+        size = len(view)
+        received = 0
+        while received < size:
+            n = await loop.sock_recv_into(sock, view[received:])
+            if n == 0:
+                raise ResponseError(
+                    f"Connection closed after {received} of {size} bytes"
+                )
+            received += n
+
     def process_response(
         self, address: Address, response_buffer: ResponseBuffer
     ) -> str:
@@ -144,55 +272,67 @@ class NetworkScanner:
             ResponseError: If response cannot be parsed
         """
         try:
-            response_stream = BytesIO(response_buffer)
-            response_message = GetTerminalTypeResponse.read(response_stream)
-
-            return (
-                f"{address}: "
-                f"protocol_version={response_message.protocol_version} "
-                f"model_id={response_message.model_id} "
-                f"model_sub_id={response_message.model_sub_id} "
-                f"serial={response_message.serial} "
-                f"software_version={response_message.software_version} "
-                f"bb_index={response_message.bb_index} "
-                f"printer_version={response_message.printer_version}"
+            response_message = GetTerminalTypeResponse.from_bytes(response_buffer)
+
+            return RESULT_FORMAT % (
+                address,
+                response_message.protocol_version,
+                response_message.model_id,
+                response_message.model_sub_id,
+                response_message.serial,
+                response_message.software_version,
+                response_message.bb_index,
+                response_message.printer_version,
             )
         except Exception as e:
             raise ResponseError(f"Failed to parse response from {address}: {e}")
 
     @staticmethod
-    def get_valid_addresses(target_cidr: str) -> list[Address]:
-        """Get list of valid IP addresses from CIDR notation
+    def get_valid_addresses(target_cidr: str) -> range:
+        """Get valid IP addresses from CIDR notation
 
         Args:
             target_cidr: Target network in CIDR notation
 
         Returns:
-            List of valid IP addresses
+            Range of valid IP addresses as packed integers
 
         Raises:
             ValueError: If CIDR is invalid
         """
         try:
             network = IPv4Network(target_cidr)
-            return [
-                str(addr)
-                for addr in network
-                if not addr.is_multicast and not addr.is_reserved
-            ]
         except ValueError as e:
             raise ValueError(f"Invalid CIDR notation: {e}")
 
-    def scan_terminals(self, target_cidr: str, show_progress: bool = True) -> None:
+        start = int(network.network_address)
+        end = min(
+            start + network.num_addresses,
+            NetworkConstants.SCANNABLE_ADDRESS_END,
+        )
+        return range(start, max(start, end))
+
+    @staticmethod
+    def format_address(packed_address: PackedAddress) -> Address:
+        """Format a packed IP address in dotted-quad notation
+
+        Args:
+            packed_address: IP address as an integer
+
+        Returns:
+            IP address string
+        """
+        return socket.inet_ntoa(struct.pack(">I", packed_address))
+
+    async def scan_terminals(
+        self, target_cidr: str, show_progress: bool = True
+    ) -> None:
         """Scan network for terminals and print results
 
         Args:
             target_cidr: Target network in CIDR notation
             show_progress: Whether to show progress bar
         """
-        # Prepare request message
-        request_buffer = GetTerminalTypeRequest("SPDENMOK").to_bytes()
-
         # Get valid addresses
         try:
             valid_addresses = self.get_valid_addresses(target_cidr)
@@ -200,31 +340,71 @@ class NetworkScanner:
             logger.error(f"Failed to parse target network: {e}")
             return
 
+        max_workers = usable_workers(self.config.max_workers)
+        if max_workers < self.config.max_workers:
+            logger.warning(
+                f"Open file limit allows only {max_workers} of "
+                f"{self.config.max_workers} concurrent connections"
+            )
+
         logger.info(
             f"Scanning {len(valid_addresses)} addresses "
-            f"with {self.config.max_workers} workers "
+            f"with up to {max_workers} concurrent connections "
             f"(timeout: {self.config.timeout}s)"
         )
 
-        with ThreadPoolExecutor(max_workers=self.config.max_workers) as executor:
-            # Submit all tasks
-            future_to_addr = {
-                executor.submit(self.send_message, addr, request_buffer): addr
-                for addr in valid_addresses
-            }
-
-            # Process responses as they complete
-            iterator = as_completed(future_to_addr)
-            if show_progress:
-                iterator = tqdm(
-                    iterator, total=len(valid_addresses), desc="Scanning", unit="addr"
-                )
+        # A fixed pool of workers shares one address iterator, so at most
+        # max_workers probes are in flight and memory stays constant no
+        # matter how large the target network is.
+        addresses = iter(valid_addresses)
+        total = len(valid_addresses)
+        # Probes complete in bursts; refresh the bar at most every 0.25s and
+        # every 0.5% of the range instead of on each update
+        progress = tqdm(
+            total=total,
+            desc="Scanning",
+            unit="addr",
+            mininterval=0.25,
+            miniters=max(1, total // 200),
+            disable=not show_progress,
+        )
 
-            for future in iterator:
-                addr = future_to_addr[future]
-                try:
-                    address, response = future.result()
-                    if response:
-                        tqdm.write(self.process_response(address, response))
-                except Exception as e:
-                    logger.error(f"Error processing {addr}: {e}")
+        # Results are written by a single printer task, which joins every
+        # line queued since its last write into one tqdm.write call
+        results: asyncio.Queue[str | None] = asyncio.Queue()
+
+        async def printer() -> None:
+            while True:
+                batch = [await results.get()]
+                while not results.empty():
+                    batch.append(results.get_nowait())
+                lines = [line for line in batch if line is not None]
+                if lines:
+                    tqdm.write("\n".join(lines))
+                if len(lines) < len(batch):
+                    return
+
+        async def worker() -> None:
+            # Each worker receives into its own buffer; responses are parsed
+            # before the next probe, so the buffer is reused for every address
+            buffer = bytearray(self.config.buffer_size)
+            for addr in addresses:
+                address, response = await self.send_message(
+                    self.format_address(addr), REQUEST_BUFFER, buffer
+                )
+                if response is not None:
+                    try:
+                        results.put_nowait(self.process_response(address, response))
+                    except Exception as e:
+                        logger.error(f"Error processing {address}: {e}")
+                progress.update(1)
+
+        with progress:
+            printer_task = asyncio.create_task(printer())
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for _ in range(min(max_workers, total)):
+                        group.create_task(worker())
+            finally:
+                results.put_nowait(None)
+                await printer_task
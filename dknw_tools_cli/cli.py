@@ -1,30 +1,87 @@
+import asyncio
+from collections import Counter
+from contextlib import nullcontext
 import datetime
 from enum import Enum
+import functools
+import inspect
 import logging
 import os
 from typing import (
     Any,
+    Awaitable,
+    Callable,
+    Final,
     TypeVar,
-    Type,
-    cast,
     ParamSpec,
     Optional,
     Protocol,
+    get_args,
+    get_type_hints,
     runtime_checkable,
+    Sequence,
     Union,
 )
 
 import fire
-import tqdm
 
-from denmoku.methods import NetworkConfig, NetworkScanner
-from sftp.sftp_client import SftpClient, SftpConfig
-from ds2ftp.client import DS2FTPClient, DS2FTPConfig
+# Subcommands import their protocol stacks and tqdm on demand, so starting
+# the CLI only loads what the invoked command needs
 
 
 T = TypeVar("T")
 P = ParamSpec("P")
 
+# File numbers commonly used in a directory: 1-9, 10-90, ..., 100000-900000
+_COMMON_FILE_NUMS: tuple[int, ...] = tuple(
+    10**i * j for i in range(6) for j in range(1, 10)
+)
+
+# Directories a search worker completes before reporting progress
+_PROGRESS_BATCH: Final[int] = 64
+
+
+def _type_name(expected_type: Any) -> str:
+    # Optional[X] is reported as X; None is accepted by the isinstance check
+    args = [t for t in get_args(expected_type) if t is not type(None)]
+    if args:
+        return " or ".join(_type_name(t) for t in args)
+    return getattr(expected_type, "__name__", str(expected_type))
+
+
+def _validated(
+    method: Callable[P, Awaitable[T]],
+) -> Callable[P, Awaitable[T]]:
+    """Validate the arguments of a CLI method against its type hints
+
+    The hints are resolved once when the method is decorated, so a call
+    only pays one isinstance check per passed argument.
+
+    Args:
+        method: Async method to wrap
+
+    Returns:
+        The wrapped method, which raises ValueError if an argument is not of
+        its annotated type
+    """
+    signature = inspect.signature(method)
+    hints = get_type_hints(method)
+    specs = {
+        name: (hint, f"Argument `{name}` must be a {_type_name(hint)}.")
+        for name, hint in hints.items()
+        if name in signature.parameters
+    }
+
+    @functools.wraps(method)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        for name, value in signature.bind(*args, **kwargs).arguments.items():
+            spec = specs.get(name)
+            if spec is not None and not isinstance(value, spec[0]):
+                raise ValueError(spec[1])
+        return await method(*args, **kwargs)
+
+    return wrapper
+
 
 class ProtocolType(str, Enum):
     """File transfer protocol types"""
@@ -79,6 +136,7 @@ class ClientFactory:
         ctrl_port: Optional[int] = None,
         data_port: Optional[int] = None,
         timeout: float = 5.0,
+        chunk_size: Optional[int] = None,
     ) -> FileTransferClient:
         """Create a file transfer client based on the protocol type
 
@@ -89,13 +147,21 @@ class ClientFactory:
             ctrl_port: Control port for DS2FTP (optional, default: port+1)
             data_port: Data port for DS2FTP (optional, default: port)
             timeout: Connection timeout
+            chunk_size: Upload chunk size for SFTP (optional, default: client default)
 
         Returns:
             A file transfer client instance
         """
         if protocol == ProtocolType.SFTP:
-            return SftpClient(SftpConfig(host=host, port=port, timeout=timeout))
+            from sftp.sftp_client import SftpClient, SftpConfig
+
+            config = SftpConfig(host=host, port=port, timeout=timeout)
+            if chunk_size is not None:
+                config.chunk_size = chunk_size
+            return SftpClient(config)
         elif protocol == ProtocolType.DS2FTP:
+            from ds2ftp.client import DS2FTPClient, DS2FTPConfig
+
             # Default: data_port is port, ctrl_port is port+1
             _data_port = data_port or port
             _ctrl_port = ctrl_port or (_data_port + 1)
@@ -111,6 +177,76 @@ class ClientFactory:
             raise ValueError(f"Unsupported protocol: {protocol}")
 
 
+class ClientPool:
+    """Pool of connected file transfer clients
+
+    A client carries one transfer at a time, so concurrent operations each
+    borrow their own connection from the pool.
+    """
+
+    def __init__(self, clients: list[FileTransferClient]) -> None:
+        """Initialize the pool
+
+        Args:
+            clients: Clients to connect and hand out
+        """
+        self._clients = clients
+        self._connected: list[FileTransferClient] = []
+        self._idle: asyncio.Queue[FileTransferClient] = asyncio.Queue()
+        # Started operations, which may outlive callers that were cancelled
+        self._running: set[asyncio.Task] = set()
+
+    async def run(self, operation: Callable[[FileTransferClient], Awaitable[T]]) -> T:
+        """Run an operation on the next idle client
+
+        Cancelling the caller while it waits for a client withdraws the
+        operation. Once started, the operation runs to completion so its
+        connection is never abandoned half way through a transfer.
+
+        Args:
+            operation: Coroutine function taking the borrowed client
+
+        Returns:
+            The result of the operation
+        """
+        client = await self._idle.get()
+        task = asyncio.create_task(self._run(client, operation))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return await asyncio.shield(task)
+
+    async def _run(
+        self,
+        client: FileTransferClient,
+        operation: Callable[[FileTransferClient], Awaitable[T]],
+    ) -> T:
+        try:
+            return await operation(client)
+        finally:
+            self._idle.put_nowait(client)
+
+    async def __aenter__(self) -> "ClientPool":
+        """Connect all clients"""
+        try:
+            for client in self._clients:
+                await client.connect()
+                self._connected.append(client)
+                self._idle.put_nowait(client)
+        except Exception:
+            await self.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Wait for started operations, then disconnect all connected clients"""
+        # Operations whose callers were cancelled still hold a client; their
+        # results were abandoned, so only their completion matters here
+        while self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        while self._connected:
+            await self._connected.pop().disconnect()
+
+
 class Cli:
     """Command-line interface for DKNW tools."""
 
@@ -138,47 +274,25 @@ class Cli:
         Cli.__config_logger(log_level)
         self.__logger = logging.getLogger(__name__)
 
-    @staticmethod
-    def _validate_arg(arg: Any, arg_name: str, expected_type: Type[T]) -> T:
-        """Validate that an argument is of the expected type.
-
-        Args:
-            arg: The argument to validate
-            arg_name: The name of the argument (for error messages)
-            expected_type: The expected type of the argument
-
-        Returns:
-            The validated argument
-
-        Raises:
-            ValueError: If the argument is not of the expected type
-        """
-        if not isinstance(arg, expected_type):
-            raise ValueError(
-                f"Argument `{arg_name}` must be a {expected_type.__name__}."
-            )
-        return cast(T, arg)
-
-    def scan_terminals(
-        self, target: str, timeout: float = 5.0, workers: int = 255
+    @_validated
+    async def scan_terminals(
+        self, target: str, timeout: float = 5.0, workers: int = 1000
     ) -> None:
         """Scan DAM terminals.
 
         Args:
             target: Target network CIDR
             timeout: Timeout in seconds. Defaults to 5.0.
-            workers: Number of workers. Defaults to 255.
+            workers: Maximum number of concurrent connections. Defaults to 1000.
 
         Raises:
             ValueError: If any argument is of incorrect type
         """
-        target = self._validate_arg(target, "target", str)
-        timeout = self._validate_arg(timeout, "timeout", float)
-        workers = self._validate_arg(workers, "workers", int)
+        from denmoku.methods import NetworkConfig, NetworkScanner
 
         config = NetworkConfig(timeout=timeout, max_workers=workers)
         scanner = NetworkScanner(config)
-        scanner.scan_terminals(target)
+        await scanner.scan_terminals(target)
 
     async def _check_file_existence(
         self,
@@ -204,6 +318,7 @@ class Cli:
             result = await client.download_file(dir_num, file_num, dest_path)
             return result is not None and result > 0
 
+    @_validated
     async def search_dirs(
         self,
         host: str,
@@ -212,6 +327,12 @@ class Cli:
         ctrl_port: Optional[int] = None,
         data_port: Optional[int] = None,
         dest: str | None = None,
+        connections: int = 4,
+        workers: int = 4,
+        cache_dir: str | None = None,
+        cache_ttl: int = 86400,
+        hint_file: str | None = None,
+        hints_only: bool = False,
     ) -> None:
         """Search directories in a DAM terminal.
 
@@ -222,20 +343,41 @@ class Cli:
             ctrl_port: Control port for DS2FTP (optional, default: port+1)
             data_port: Data port for DS2FTP (optional, default: port)
             dest: Destination file path. If provided, found files will be downloaded.
+            connections: Number of connections used to probe files concurrently. Defaults to 4.
+            workers: Number of directories searched concurrently. Defaults to 4.
+            cache_dir: Directory to keep search results in. If provided, directories searched within `cache_ttl` are not probed again.
+            cache_ttl: Seconds a cached search result stays valid. Defaults to 86400.
+            hint_file: File of whitespace-separated directory numbers to search before all others (optional)
+            hints_only: Search only the directories in `hint_file`. Defaults to False.
 
         Raises:
             ValueError: If any argument is of incorrect type
         """
-        host = self._validate_arg(host, "host", str)
-        port = self._validate_arg(port, "port", int)
-        protocol = self._validate_arg(protocol, "protocol", str)
-        if ctrl_port is not None:
-            ctrl_port = self._validate_arg(ctrl_port, "ctrl_port", int)
-        if data_port is not None:
-            data_port = self._validate_arg(data_port, "data_port", int)
+        import tqdm
+
+        from dknw_tools_cli.probe_cache import ProbeCache
+
         if dest is not None:
-            dest = self._validate_arg(dest, "dest", str)
             os.makedirs(dest, exist_ok=True)
+        if connections < 1:
+            raise ValueError("Argument `connections` must be positive.")
+        if workers < 1:
+            raise ValueError("Argument `workers` must be positive.")
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+        if hints_only and hint_file is None:
+            raise ValueError("Argument `hints_only` requires `hint_file`.")
+
+        dir_nums = range(1, 9999)
+        hints: list[int] = []
+        if hint_file is not None:
+            with open(hint_file) as f:
+                try:
+                    hints = [int(token) for token in f.read().split()]
+                except ValueError as e:
+                    raise ValueError(f"Invalid hint file: {e}")
+            # Drop duplicates and out-of-range numbers, keeping the given order
+            hints = [n for n in dict.fromkeys(hints) if n in dir_nums]
 
         try:
             protocol_type = ProtocolType(protocol.lower())
@@ -244,48 +386,156 @@ class Cli:
                 f"Unsupported protocol: {protocol}. Use 'sftp' or 'ds2ftp'."
             )
 
-        client = ClientFactory.create_client(
-            protocol=protocol_type,
-            host=host,
-            port=port,
-            ctrl_port=ctrl_port,
-            data_port=data_port,
+        pool = ClientPool(
+            [
+                ClientFactory.create_client(
+                    protocol=protocol_type,
+                    host=host,
+                    port=port,
+                    ctrl_port=ctrl_port,
+                    data_port=data_port,
+                )
+                for _ in range(connections)
+            ]
         )
 
-        async with client:
+        # The date-based file plus common file numbers; the date is fixed for
+        # the whole scan. Recent uploads use the date-based name, so it leads.
+        today = datetime.date.today()
+        date_file_num = 10000 + today.month * 100 + today.day  # 1MMDD
+        file_nums = (date_file_num,) + _COMMON_FILE_NUMS
+        # Hits per file number. Terminals tend to reuse the same file numbers
+        # across directories, so those are probed first.
+        file_num_hits: Counter[int] = Counter()
+        dest_prefix = None if dest is None else os.path.join(dest, "")
+
+        cache = (
+            None
+            if cache_dir is None
+            else ProbeCache(os.path.join(cache_dir, f"{host}_{port}.db"), cache_ttl)
+        )
 
-            async def exists_dir(dir_num: int) -> bool:
-                # Check common file numbers
-                for i in range(6):
-                    for j in range(1, 10):
-                        file_num = 10**i * j
-                        dest_path = (
-                            None
-                            if dest is None
-                            else os.path.join(dest, f"{dir_num}.{file_num}")
-                        )
-                        if await self._check_file_existence(
-                            client, dir_num, file_num, dest_path
-                        ):
-                            return True
-
-                # Check date-based file
-                mmdd = datetime.datetime.now().strftime("%m%d")
-                file_num = int(f"1{mmdd}")
-                dest_path = (
-                    None
-                    if dest is None
-                    else os.path.join(dest, f"{dir_num}.{file_num}")
+        async with pool:
+
+            async def check_file(dir_num: int, file_num: int) -> int | None:
+                exists = await pool.run(
+                    lambda client: self._check_file_existence(client, dir_num, file_num)
                 )
-                return await self._check_file_existence(
-                    client, dir_num, file_num, dest_path
+                if not exists:
+                    return None
+                file_num_hits[file_num] += 1
+                return file_num
+
+            async def find_file(dir_num: int) -> int | None:
+                # Probe all candidates concurrently and stop at the first hit.
+                # The pool serves waiting probes in order, so the most frequent
+                # hits so far get a connection first.
+                pending = {
+                    asyncio.create_task(check_file(dir_num, file_num))
+                    for file_num in sorted(
+                        file_nums, key=file_num_hits.__getitem__, reverse=True
+                    )
+                }
+                try:
+                    while pending:
+                        done, pending = await asyncio.wait(
+                            pending, return_when=asyncio.FIRST_COMPLETED
+                        )
+                        for task in done:
+                            if task.result() is not None:
+                                return task.result()
+                    return None
+                finally:
+                    for task in pending:
+                        task.cancel()
+
+            async def download(dir_num: int, file_num: int) -> None:
+                # Candidates are only probed, so just the file found in a
+                # directory is transferred
+                dest_path = f"{dest_prefix}{dir_num}.{file_num}"
+                await pool.run(
+                    lambda client: self._check_file_existence(
+                        client, dir_num, file_num, dest_path
+                    )
                 )
 
-            # Use tqdm for progress tracking
-            for dir_num in tqdm.trange(1, 9999):
-                if await exists_dir(dir_num):
-                    tqdm.tqdm.write(f"Directory found: {dir_num}")
+            # Found directories are reported by a single printer task, which
+            # writes every hit queued since its last write in one call
+            hits: asyncio.Queue[int | None] = asyncio.Queue()
+
+            async def printer() -> None:
+                while True:
+                    batch = [await hits.get()]
+                    while not hits.empty():
+                        batch.append(hits.get_nowait())
+                    lines = [
+                        f"Directory found: {dir_num}"
+                        for dir_num in batch
+                        if dir_num is not None
+                    ]
+                    if lines:
+                        tqdm.tqdm.write("\n".join(lines))
+                    if len(lines) < len(batch):
+                        return
+
+            async def search(targets: Sequence[int], desc: str) -> None:
+                # A fixed set of workers shares one directory iterator, so only
+                # `workers` directories are in flight however many are searched
+                remaining = iter(targets)
+
+                async def worker(progress: tqdm.tqdm) -> None:
+                    # Progress is reported in batches to keep bar updates rare
+                    searched = 0
+                    for dir_num in remaining:
+                        cached = None if cache is None else cache.get(dir_num)
+                        if cached is not None:
+                            found, file_num = cached
+                        else:
+                            file_num = await find_file(dir_num)
+                            if cache is not None:
+                                cache.put(dir_num, file_num)
+                            found = file_num is not None
+                        if found:
+                            # Cached hits are downloaded too, using the file
+                            # number found when the directory was probed
+                            if dest_prefix is not None and file_num is not None:
+                                await download(dir_num, file_num)
+                            hits.put_nowait(dir_num)
+                        searched += 1
+                        if searched >= _PROGRESS_BATCH:
+                            progress.update(searched)
+                            searched = 0
+                    progress.update(searched)
+
+                with tqdm.tqdm(
+                    total=len(targets),
+                    desc=desc,
+                    miniters=256,
+                    mininterval=0.5,
+                    smoothing=0.1,
+                ) as progress:
+                    async with asyncio.TaskGroup() as group:
+                        for _ in range(min(workers, len(targets))):
+                            group.create_task(worker(progress))
+
+            with nullcontext() if cache is None else cache:
+                printer_task = asyncio.create_task(printer())
+                try:
+                    if hints:
+                        await search(hints, "Hints")
+                    if not hints_only:
+                        hinted = set(hints)
+                        targets = (
+                            [n for n in dir_nums if n not in hinted]
+                            if hinted
+                            else dir_nums
+                        )
+                        await search(targets, "Directories")
+                finally:
+                    hits.put_nowait(None)
+                    await printer_task
 
+    @_validated
     async def download_file(
         self,
         host: str,
@@ -312,17 +562,6 @@ class Cli:
         Raises:
             ValueError: If any argument is of incorrect type
         """
-        host = self._validate_arg(host, "host", str)
-        port = self._validate_arg(port, "port", int)
-        dir = self._validate_arg(dir, "dir", int)
-        file = self._validate_arg(file, "file", int)
-        dest = self._validate_arg(dest, "dest", str)
-        protocol = self._validate_arg(protocol, "protocol", str)
-        if ctrl_port is not None:
-            ctrl_port = self._validate_arg(ctrl_port, "ctrl_port", int)
-        if data_port is not None:
-            data_port = self._validate_arg(data_port, "data_port", int)
-
         try:
             protocol_type = ProtocolType(protocol.lower())
         except ValueError:
@@ -345,6 +584,7 @@ class Cli:
             else:
                 self.__logger.info(f"Successfully downloaded {result} bytes to {dest}")
 
+    @_validated
     async def upload_file(
         self,
         host: str,
@@ -355,6 +595,7 @@ class Cli:
         protocol: str = "sftp",
         ctrl_port: Optional[int] = None,
         data_port: Optional[int] = None,
+        chunk_size: Optional[int] = None,
     ) -> None:
         """Upload a file to a DAM terminal.
 
@@ -367,21 +608,11 @@ class Cli:
             protocol: Protocol type ("sftp" or "ds2ftp"). Defaults to "sftp".
             ctrl_port: Control port for DS2FTP (optional, default: port+1)
             data_port: Data port for DS2FTP (optional, default: port)
+            chunk_size: Bytes sent per F_DATA for SFTP (optional, default: 4088). DS2FTP chunks are sized by the server.
 
         Raises:
             ValueError: If any argument is of incorrect type
         """
-        host = self._validate_arg(host, "host", str)
-        port = self._validate_arg(port, "port", int)
-        src = self._validate_arg(src, "src", str)
-        dir = self._validate_arg(dir, "dir", int)
-        file = self._validate_arg(file, "file", int)
-        protocol = self._validate_arg(protocol, "protocol", str)
-        if ctrl_port is not None:
-            ctrl_port = self._validate_arg(ctrl_port, "ctrl_port", int)
-        if data_port is not None:
-            data_port = self._validate_arg(data_port, "data_port", int)
-
         if not os.path.exists(src):
             raise FileNotFoundError(f"Source file '{src}' not found")
 
@@ -398,6 +629,7 @@ class Cli:
             port=port,
             ctrl_port=ctrl_port,
             data_port=data_port,
+            chunk_size=chunk_size,
         )
 
         async with client:
@@ -412,6 +644,13 @@ class Cli:
 
 def main() -> None:
     """Entry point for the dknw-tools CLI application."""
+    # uvloop is optional; the default event loop is used when it is missing
+    try:
+        import uvloop
+    except ImportError:
+        pass
+    else:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     fire.Fire(Cli)
 
 
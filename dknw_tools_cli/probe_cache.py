@@ -0,0 +1,91 @@
+from logging import getLogger
+import sqlite3
+import time
+from typing import Final, Self
+
+logger = getLogger(__name__)
+
+
+class ProbeCache:
+    """On-disk cache of directory search results
+
+    Results are stored per directory number with the time they were probed,
+    so an interrupted or repeated search can skip directories probed within
+    the TTL.
+    """
+
+    # Number of stored results between commits
+    COMMIT_INTERVAL: Final[int] = 256
+
+    def __init__(self, path: str, ttl: float) -> None:
+        """Open or create the cache database
+
+        Args:
+            path: Database file path
+            ttl: Seconds a stored result stays valid
+        """
+        self.__ttl = ttl
+        self.__uncommitted = 0
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(
+            "CREATE TABLE IF NOT EXISTS probes ("
+            "dir_num INTEGER PRIMARY KEY, "
+            "file_num INTEGER, "
+            "hit INTEGER NOT NULL, "
+            "ts INTEGER NOT NULL)"
+        )
+
+    def get(self, dir_num: int) -> tuple[bool, int | None] | None:
+        """Get a fresh result for a directory
+
+        Args:
+            dir_num: Directory number
+
+        Returns:
+            Tuple of (hit, file number found) or None if there is no fresh result
+        """
+        row = self.__connection.execute(
+            "SELECT hit, file_num FROM probes WHERE dir_num = ? AND ts > ?",
+            (dir_num, int(time.time() - self.__ttl)),
+        ).fetchone()
+        if row is None:
+            return None
+        return bool(row[0]), row[1]
+
+    def put(self, dir_num: int, file_num: int | None) -> None:
+        """Store the result for a directory
+
+        Args:
+            dir_num: Directory number
+            file_num: File number found in the directory, None if none was found
+        """
+        self.__connection.execute(
+            "INSERT OR REPLACE INTO probes (dir_num, file_num, hit, ts) "
+            "VALUES (?, ?, ?, ?)",
+            (dir_num, file_num, file_num is not None, int(time.time())),
+        )
+        self.__uncommitted += 1
+        if self.__uncommitted >= self.COMMIT_INTERVAL:
+            self.commit()
+
+    def commit(self) -> None:
+        """Commit stored results"""
+        self.__connection.commit()
+        self.__uncommitted = 0
+
+    def close(self) -> None:
+        """Commit stored results and close the database"""
+        try:
+            self.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to commit probe cache: {e}")
+        self.__connection.close()
+
+    def __enter__(self) -> Self:
+        """Context manager enter"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Context manager exit"""
+        self.close()
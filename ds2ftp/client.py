@@ -2,9 +2,10 @@ import asyncio
 from dataclasses import dataclass
 import logging
 import os
-from typing import Self
+import socket
+from typing import BinaryIO, ClassVar, Iterable, Self
 
-from .command import DS2FTPCTS, DS2FTPCommand, DS2FTPCommandType, FileMode
+from .command import DS2FTPCTS, DS2FTPCommand, DS2FTPCommandType, ErrorCode, FileMode
 
 # Configure module logger
 logger = logging.getLogger(__name__)
@@ -24,21 +25,48 @@ class DS2FTPConfig:
 class DS2FTPChannel:
     """DS2FTP communication channel (control or data)."""
 
-    def __init__(self, name: str, host: str, port: int, timeout: float) -> None:
-        """Initialize channel."""
+    def __init__(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        timeout: float,
+        write_buffer_high: int | None = None,
+    ) -> None:
+        """Initialize channel.
+
+        write_buffer_high, if given, is the transport's write buffer high-water
+        mark, so drain() waits until written data has reached the socket.
+        """
         self.name = name
         self.host = host
         self.port = port
         self.timeout = timeout
+        self.write_buffer_high = write_buffer_high
         self.reader: asyncio.StreamReader | None = None
         self.writer: asyncio.StreamWriter | None = None
+        self.transport: asyncio.WriteTransport | None = None
+
+    async def _open(self) -> asyncio.WriteTransport:
+        """Open the connection and return its transport."""
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self.writer.transport
+
+    async def _drain(self) -> None:
+        """Wait until the write buffer is below its high-water mark."""
+        await self.writer.drain()
 
     async def connect(self) -> None:
         """Connect to the channel."""
         try:
-            self.reader, self.writer = await asyncio.wait_for(
-                asyncio.open_connection(self.host, self.port), timeout=self.timeout
-            )
+            self.transport = await asyncio.wait_for(self._open(), timeout=self.timeout)
+            # Frames are sent in lockstep with the peer, so never hold them
+            # back for Nagle's algorithm
+            sock = self.transport.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            if self.write_buffer_high is not None:
+                self.transport.set_write_buffer_limits(high=self.write_buffer_high)
             logger.debug(
                 f"{self.name} channel connection established to {self.host}:{self.port}"
             )
@@ -65,19 +93,25 @@ class DS2FTPChannel:
             finally:
                 self.writer = None
                 self.reader = None
+                self.transport = None
 
-    async def send(self, data: bytes) -> bool:
-        """Send data on the channel."""
-        if not self.writer:
+    async def send(self, data: bytes, drain: bool = True) -> bool:
+        """Send data on the channel.
+
+        Callers about to wait for the peer's reply can skip the drain with
+        drain=False.
+        """
+        if not self.transport:
             logger.error(
                 f"Attempted to send on {self.name} channel while not connected"
             )
             raise ConnectionError(f"{self.name} channel not connected")
 
         try:
-            self.writer.write(data)
-            await self.writer.drain()
-            logger.debug(f"Sent {len(data)} bytes on {self.name} channel")
+            self.transport.write(data)
+            if drain:
+                await self._drain()
+            logger.debug("Sent %d bytes on %s channel", len(data), self.name)
             return True
         except (asyncio.TimeoutError, OSError) as e:
             logger.error(f"Failed to send data on {self.name} channel: {str(e)}")
@@ -85,6 +119,51 @@ class DS2FTPChannel:
                 f"Failed to send data on {self.name} channel: {str(e)}"
             )
 
+    async def send_parts(self, parts: Iterable[bytes], drain: bool = True) -> bool:
+        """Send data given in parts on the channel in a single write."""
+        if not self.transport:
+            logger.error(
+                f"Attempted to send on {self.name} channel while not connected"
+            )
+            raise ConnectionError(f"{self.name} channel not connected")
+
+        try:
+            self.transport.writelines(parts)
+            if drain:
+                await self._drain()
+            logger.debug("Sent parts on %s channel", self.name)
+            return True
+        except (asyncio.TimeoutError, OSError) as e:
+            logger.error(f"Failed to send data on {self.name} channel: {str(e)}")
+            raise ConnectionError(
+                f"Failed to send data on {self.name} channel: {str(e)}"
+            )
+
+    async def send_file(self, file: BinaryIO, offset: int, count: int) -> int:
+        """Send part of a file on the channel with the event loop's sendfile.
+
+        Raises NotImplementedError if the event loop has no sendfile support.
+
+        Returns:
+            Number of bytes sent
+        """
+        if not self.transport:
+            logger.error(
+                f"Attempted to send on {self.name} channel while not connected"
+            )
+            raise ConnectionError(f"{self.name} channel not connected")
+
+        loop = asyncio.get_running_loop()
+        try:
+            sent = await loop.sendfile(self.transport, file, offset, count)
+            logger.debug("Sent %d bytes of file on %s channel", sent, self.name)
+            return sent
+        except (asyncio.TimeoutError, OSError) as e:
+            logger.error(f"Failed to send data on {self.name} channel: {str(e)}")
+            raise ConnectionError(
+                f"Failed to send data on {self.name} channel: {str(e)}"
+            )
+
     async def receive(self, size: int, timeout: float | None = None) -> bytes:
         """Receive data from the channel."""
         if not self.reader:
@@ -93,7 +172,7 @@ class DS2FTPChannel:
             )
             raise ConnectionError(f"{self.name} channel not connected")
 
-        timeout_val = timeout or self.timeout
+        timeout_val = self.timeout if timeout is None else timeout
 
         try:
             data = await asyncio.wait_for(self.reader.read(size), timeout=timeout_val)
@@ -101,7 +180,7 @@ class DS2FTPChannel:
             if not data:
                 raise ConnectionError(f"{self.name} channel closed by server")
 
-            logger.debug(f"Received {len(data)} bytes on {self.name} channel")
+            logger.debug("Received %d bytes on %s channel", len(data), self.name)
             return data
 
         except asyncio.TimeoutError:
@@ -113,23 +192,279 @@ class DS2FTPChannel:
                 f"Failed to receive data from {self.name} channel: {str(e)}"
             )
 
+    async def discard_received(self) -> int:
+        """Drop data already received but not read yet.
+
+        Returns:
+            Number of bytes dropped
+        """
+        if not self.reader:
+            return 0
+
+        dropped = 0
+        while True:
+            try:
+                # An expired deadline only lets a read return buffered data
+                async with asyncio.timeout(0):
+                    data = await self.reader.read(0x10000)
+            except asyncio.TimeoutError:
+                return dropped
+            if not data:
+                return dropped
+            dropped += len(data)
+
+
+class DS2FTPDataProtocol(asyncio.BufferedProtocol):
+    """Data channel protocol receiving blocks straight into their buffer.
+
+    Data arriving while no block is being received is kept aside and moved
+    to the start of the next block.
+    """
+
+    # Size of the buffer for data arriving outside a block
+    SPARE_SIZE: ClassVar[int] = 0x10000
+
+    def __init__(self) -> None:
+        """Initialize protocol."""
+        self._spare = memoryview(bytearray(self.SPARE_SIZE))
+        self._pending = bytearray()
+        self._block: memoryview | None = None
+        self._filled = 0
+        self._waiter: asyncio.Future[None] | None = None
+        self._drain_waiter: asyncio.Future[None] | None = None
+        self._write_paused = False
+        self.closed = False
+        self.lost: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Get the buffer the transport reads into."""
+        if self._block is not None and self._filled < len(self._block):
+            return self._block[self._filled :]
+        return self._spare
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Account for data the transport read into the buffer."""
+        if self._block is not None and self._filled < len(self._block):
+            self._filled += nbytes
+            if self._filled >= len(self._block):
+                self._wake()
+        else:
+            self._pending += self._spare[:nbytes]
+
+    def eof_received(self) -> bool:
+        """Handle the end of data from the server."""
+        self.closed = True
+        self._wake()
+        return False
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Handle the closed connection."""
+        self.closed = True
+        self._wake()
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+        if not self.lost.done():
+            self.lost.set_result(None)
+
+    def pause_writing(self) -> None:
+        """Handle the write buffer going over its high-water mark."""
+        self._write_paused = True
+
+    def resume_writing(self) -> None:
+        """Handle the write buffer draining below its low-water mark."""
+        self._write_paused = False
+        if self._drain_waiter is not None and not self._drain_waiter.done():
+            self._drain_waiter.set_result(None)
+
+    async def drain(self) -> None:
+        """Wait until the write buffer is below its high-water mark."""
+        if self._write_paused and not self.closed:
+            self._drain_waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._drain_waiter
+            finally:
+                self._drain_waiter = None
+        if self.closed:
+            raise ConnectionResetError("Connection lost")
+
+    def start_block(self, block: memoryview) -> None:
+        """Start receiving into block, beginning with data kept aside."""
+        filled = min(len(self._pending), len(block))
+        if filled:
+            block[:filled] = self._pending[:filled]
+            del self._pending[:filled]
+        self._block = block
+        self._filled = filled
+
+    async def wait_block(self) -> None:
+        """Wait until the block is full or the server stops sending."""
+        while self._filled < len(self._block) and not self.closed:
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+    def end_block(self) -> int:
+        """Stop receiving into the block.
+
+        Returns:
+            Number of bytes received into the block
+        """
+        self._block = None
+        return self._filled
+
+    def discard_pending(self) -> int:
+        """Drop data kept aside for the next block.
+
+        Returns:
+            Number of bytes dropped
+        """
+        dropped = len(self._pending)
+        self._pending.clear()
+        return dropped
+
+    def _wake(self) -> None:
+        """Wake the coroutine waiting for a block."""
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+
+class DS2FTPDataChannel(DS2FTPChannel):
+    """DS2FTP data channel receiving into caller buffers without a StreamReader."""
+
+    def __init__(
+        self,
+        name: str,
+        host: str,
+        port: int,
+        timeout: float,
+        write_buffer_high: int | None = None,
+    ) -> None:
+        """Initialize channel."""
+        super().__init__(name, host, port, timeout, write_buffer_high)
+        self.protocol: DS2FTPDataProtocol | None = None
+
+    async def _open(self) -> asyncio.WriteTransport:
+        """Open the connection and return its transport."""
+        loop = asyncio.get_running_loop()
+        transport, self.protocol = await loop.create_connection(
+            DS2FTPDataProtocol, self.host, self.port
+        )
+        return transport
+
+    async def _drain(self) -> None:
+        """Wait until the write buffer is below its high-water mark."""
+        await self.protocol.drain()
+
+    async def disconnect(self) -> None:
+        """Disconnect from the channel."""
+        if self.transport:
+            try:
+                self.transport.close()
+                await self.protocol.lost
+                logger.debug(f"{self.name} channel closed")
+            except Exception as e:
+                logger.error(f"Error closing {self.name} channel: {e}")
+            finally:
+                self.transport = None
+                self.protocol = None
+
+    async def receive_into(self, block: bytearray, timeout: float | None = None) -> int:
+        """
+        Receive data into block until it is full.
+
+        Fewer bytes are received if the server closes the channel or the
+        timeout expires after some data arrived.
+
+        Returns:
+            Number of bytes received
+        """
+        if not self.protocol:
+            logger.error(
+                f"Attempted to receive on {self.name} channel while not connected"
+            )
+            raise ConnectionError(f"{self.name} channel not connected")
+
+        timeout_val = self.timeout if timeout is None else timeout
+        view = memoryview(block)
+        self.protocol.start_block(view)
+        try:
+            try:
+                # The whole block shares one deadline, however it is split
+                async with asyncio.timeout(timeout_val):
+                    await self.protocol.wait_block()
+            finally:
+                received = self.protocol.end_block()
+                view.release()
+        except asyncio.TimeoutError:
+            # Partial data received
+            if received:
+                logger.warning(
+                    f"Partial data received ({received}/{len(block)} bytes) before timeout"
+                )
+                return received
+
+            logger.error(f"{self.name} channel receive timeout")
+            raise ConnectionError(f"{self.name} channel receive timeout")
+
+        if not received and len(block):
+            raise ConnectionError(f"{self.name} channel closed by server")
+
+        logger.debug(
+            "Received %d bytes on %s channel (requested: %d)",
+            received,
+            self.name,
+            len(block),
+        )
+        return received
+
+    async def discard_received(self) -> int:
+        """Drop data already received but not read yet.
+
+        Returns:
+            Number of bytes dropped
+        """
+        return self.protocol.discard_pending() if self.protocol else 0
+
+    async def receive(self, size: int, timeout: float | None = None) -> bytes:
+        """Receive data from the channel."""
+        data = bytearray(size)
+        received = await self.receive_into(data, timeout)
+        del data[received:]
+        return bytes(data)
+
 
 class DS2FTPClient:
     """Async DS2FTP client implementation with separate control and data ports."""
 
+    # Destination directories already created by download_file
+    _ensured_dirs: ClassVar[set[str]] = set()
+    # Error code of the error CTS that aborts a transfer opened by stat_file.
+    # DS2FTP has no cancel code, so stat_file refuses the transfer as a
+    # receiver that cannot open its destination file would.
+    STAT_ABORT_CODE: ClassVar[ErrorCode] = ErrorCode.ERROR_FOPEN
+    # Seconds the control channel must stay idle after such an abort before
+    # the aborted transfer counts as closed
+    STAT_SETTLE_TIME: ClassVar[float] = 0.2
+
     def __init__(self, config: DS2FTPConfig) -> None:
         """Initialize DS2FTP client."""
         self._config = config
 
         # Communication channels
         self._ctrl_channel = DS2FTPChannel(
-            "Control", config.host, config.ctrl_port, config.timeout
+            "Control", config.host, config.ctrl_port, config.timeout, 0
         )
-        self._data_channel = DS2FTPChannel(
-            "Data", config.host, config.data_port, config.timeout
+        # A zero write buffer lets upload chunks reuse their read buffer
+        self._data_channel = DS2FTPDataChannel(
+            "Data", config.host, config.data_port, config.timeout, 0
         )
+        self._use_sendfile = True
+        self._send_buffer = bytearray()
 
-        self._lock = asyncio.Lock()
+        # Set while a transfer uses the channels; one client runs one at a time
+        self._busy = False
 
         # Internal state
         self.mode = FileMode.NONE
@@ -173,84 +508,73 @@ class DS2FTPClient:
         await self._data_channel.disconnect()
         await self._ctrl_channel.disconnect()
 
-    async def ctrl_send(self, data: bytes) -> bool:
+    async def ctrl_send(self, data: bytes, drain: bool = True) -> bool:
         """Send data on control channel."""
-        return await self._ctrl_channel.send(data)
+        return await self._ctrl_channel.send(data, drain)
+
+    async def ctrl_send_parts(self, parts: Iterable[bytes], drain: bool = True) -> bool:
+        """Send data given in parts on control channel."""
+        return await self._ctrl_channel.send_parts(parts, drain)
 
     async def ctrl_receive(self, timeout: float | None = None) -> bytes:
         """Receive data from control channel with DS2FTP protocol parsing."""
         if not self._ctrl_channel.reader:
             raise ConnectionError("Control channel not connected")
 
-        timeout_val = timeout or self._config.timeout
+        timeout_val = self._config.timeout if timeout is None else timeout
+        reader = self._ctrl_channel.reader
+        header = DS2FTPCommand.DS2_HEADER
 
         try:
-            # Find DS2 header
-            while True:
-                header = await asyncio.wait_for(
-                    self._ctrl_channel.reader.read(4), timeout=timeout_val
-                )
-                if not header:
-                    raise ConnectionError("Control channel closed by server")
-
-                if header == DS2FTPCommand.DS2_HEADER:
-                    break
-
-            # Read command type
-            cmd_type_bytes = await asyncio.wait_for(
-                self._ctrl_channel.reader.read(4), timeout=timeout_val
-            )
-            if not cmd_type_bytes or len(cmd_type_bytes) < 4:
-                raise ConnectionError(
-                    "Failed to read command type from control channel"
-                )
-
-            cmd_type = int.from_bytes(cmd_type_bytes, "big")
-
-            # Determine command length
-            cmd_length = 0
-            for i, cmd_id in enumerate(DS2FTPCommand.DS2FTP_CMD):
-                if cmd_id == cmd_type:
-                    cmd_length = DS2FTPCommand.DS2FTP_CMD_LENGTH[i]
-                    break
+            # All reads of the frame share one deadline
+            async with asyncio.timeout(timeout_val):
+                # Read a frame of the shortest length, then the rest if needed
+                frame = await reader.readexactly(DS2FTPCommand.MIN_CMD_LENGTH)
+
+                frame_header, cmd_type = DS2FTPCommand.HDR_TYPE.unpack_from(frame)
+
+                # Find DS2 header
+                while frame_header != header:
+                    index = frame.find(header, 1)
+                    if index < 0:
+                        # Keep a trailing partial header
+                        index = len(frame) - len(header) + 1
+                    frame = frame[index:] + await reader.readexactly(index)
+                    frame_header, cmd_type = DS2FTPCommand.HDR_TYPE.unpack_from(frame)
+
+                # Determine command length
+                cmd_length = DS2FTPCommand.CMD_LENGTH_MAP.get(cmd_type, 0)
+
+                if cmd_length == 0:
+                    logger.error(
+                        f"Unknown command type received on control channel: {cmd_type}"
+                    )
+                    return frame
 
-            if cmd_length == 0:
-                logger.error(
-                    f"Unknown command type received on control channel: {cmd_type}"
-                )
-                return header + cmd_type_bytes
+                # Read remaining command body
+                if cmd_length > len(frame):
+                    frame += await reader.readexactly(cmd_length - len(frame))
 
-            # Read remaining command body
-            remaining = cmd_length - 8  # header(4) + command type(4)
-            cmd_body = await asyncio.wait_for(
-                self._ctrl_channel.reader.read(remaining), timeout=timeout_val
-            )
-
-            if not cmd_body or len(cmd_body) < remaining - 4:
-                raise ConnectionError(
-                    "Failed to read command body from control channel"
-                )
-
-            # For ERRORCTS, read additional variable length data
+            # For ERRORCTS, read additional newline-terminated error message
             if cmd_type == DS2FTPCommandType.ERRORCTS.value:
-                more_data = bytearray()
                 try:
-                    while True:
-                        byte = await asyncio.wait_for(
-                            self._ctrl_channel.reader.read(1),
-                            timeout=1.0,  # Shorter timeout for error message
-                        )
-                        if not byte or byte == b"\n":
-                            break
-                        more_data.extend(byte)
-                except asyncio.TimeoutError:
-                    pass  # End of data or timeout
+                    more_data = await asyncio.wait_for(
+                        reader.readuntil(b"\n"),
+                        timeout=1.0,  # Shorter timeout for error message
+                    )
+                    more_data = more_data[:-1]
+                except asyncio.IncompleteReadError as e:
+                    more_data = e.partial  # Closed before the newline
+                except (asyncio.TimeoutError, asyncio.LimitOverrunError):
+                    more_data = b""  # No terminated message
 
                 if more_data:
-                    cmd_body += more_data
+                    frame += more_data
 
-            return header + cmd_type_bytes + cmd_body
+            return frame
 
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Control channel closed by server")
         except asyncio.TimeoutError:
             logger.error("Control channel receive timeout")
             raise ConnectionError("Control channel receive timeout")
@@ -264,52 +588,41 @@ class DS2FTPClient:
         """Send data on data channel."""
         return await self._data_channel.send(data)
 
-    async def data_receive(self, size: int, timeout: float | None = None) -> bytes:
-        """Receive specified size of data from data channel with partial read handling."""
-        if not self._data_channel.reader:
-            raise ConnectionError("Data channel not connected")
-
-        timeout_val = timeout or self._config.timeout
-        received_data = bytearray()
-        remaining = size
-
-        try:
-            while remaining > 0:
-                chunk = await asyncio.wait_for(
-                    self._data_channel.reader.read(remaining), timeout=timeout_val
-                )
-
-                if not chunk:  # Connection closed
-                    if not received_data:  # Data nothing to error
-                        raise ConnectionError("Data channel closed by server")
-                    break  # Partial data received
-
-                received_data.extend(chunk)
-                remaining -= len(chunk)
-                logger.debug(
-                    f"Received chunk of {len(chunk)} bytes, {remaining} bytes remaining"
-                )
-
-                # Shorten timeout
-                if remaining > 0:
-                    timeout_val = min(timeout_val, 2.0)
+    async def data_send_file(self, file: BinaryIO, offset: int, size: int) -> int:
+        """Send part of a file on data channel.
 
-            total_received = len(received_data)
-            logger.debug(
-                f"Received total of {total_received} bytes on Data channel (requested: {size})"
-            )
-            return bytes(received_data)
+        The file position must be at offset. The part is sent with sendfile
+        where the event loop supports it, otherwise it is read into a buffer
+        reused across calls.
 
-        except asyncio.TimeoutError:
-            # Partial data received
-            if received_data:
-                logger.warning(
-                    f"Partial data received ({len(received_data)}/{size} bytes) before timeout"
-                )
-                return bytes(received_data)
+        Returns:
+            Number of bytes sent (0 at end of file)
+        """
+        if self._use_sendfile:
+            try:
+                return await self._data_channel.send_file(file, offset, size)
+            except NotImplementedError:
+                # e.g. uvloop has no loop.sendfile
+                logger.debug("Event loop has no sendfile, reading into buffer")
+                self._use_sendfile = False
+
+        if len(self._send_buffer) < size:
+            self._send_buffer = bytearray(size)
+        with memoryview(self._send_buffer) as view:
+            length = file.readinto(view[:size])
+            if length and not await self.data_send(view[:length]):
+                return 0
+        return length or 0
 
-            logger.error("Data channel receive timeout")
-            raise ConnectionError("Data channel receive timeout")
+    async def data_receive(self, size: int, timeout: float | None = None) -> bytearray:
+        """Receive specified size of data from data channel with partial read handling."""
+        # The block is received into a buffer of its final size; it is only
+        # truncated if the server sends less than requested
+        received_data = bytearray(size)
+        received = await self._data_channel.receive_into(received_data, timeout)
+        if received < size:
+            del received_data[received:]
+        return received_data
 
     def _reset_processing_info(self) -> None:
         """Reset transfer state."""
@@ -321,11 +634,8 @@ class DS2FTPClient:
 
     async def send_cts(self, size: int) -> bool:
         """Send CTS (control channel)."""
-        # Use current state to generate CTS
-        cmd = DS2FTPCommand()
-
         # Generate CTS with current state
-        data = cmd.make_cts(self.total, self.done, size)
+        parts = DS2FTPCommand.make_cts_parts(self.total, self.done, size)
 
         # Record sent CTS
         self.last_cts.tsize = self.total
@@ -333,9 +643,44 @@ class DS2FTPClient:
         self.last_cts.bsize = size
 
         logger.debug(
-            f"Sending CTS - total: {self.total}, done: {self.done}, next: {size}"
+            "Sending CTS - total: %d, done: %d, next: %d", self.total, self.done, size
         )
-        return await self.ctrl_send(data)
+        return await self.ctrl_send_parts(parts)
+
+    async def _discard_stale(self) -> None:
+        """Drop what an earlier transfer left unread on both channels.
+
+        A transfer that ended early, such as one aborted by stat_file, may
+        leave frames or data behind that would be read as the reply to the
+        next request.
+        """
+        ctrl = await self._ctrl_channel.discard_received()
+        data = await self._data_channel.discard_received()
+        if ctrl or data:
+            logger.debug(
+                "Dropped stale input - control: %d bytes, data: %d bytes", ctrl, data
+            )
+
+    async def _settle_abort(self) -> None:
+        """Wait until the server is done with an aborted transfer.
+
+        DS2FTP defines no reply to an error CTS, so whatever the server sends
+        until the control channel stays idle for STAT_SETTLE_TIME is dropped.
+        """
+        reader = self._ctrl_channel.reader
+        dropped = 0
+        while reader:
+            try:
+                async with asyncio.timeout(self.STAT_SETTLE_TIME):
+                    data = await reader.read(0x10000)
+            except asyncio.TimeoutError:
+                break
+            if not data:
+                break
+            dropped += len(data)
+        if dropped:
+            logger.debug("Dropped %d bytes sent after the abort", dropped)
+        await self._discard_stale()
 
     async def send_error_cts(self, error_code: int, error_msg: str = "") -> bool:
         """Send error CTS (control channel)."""
@@ -355,92 +700,145 @@ class DS2FTPClient:
         Returns:
             Number of bytes downloaded (0 on failure)
         """
-        logger.debug(f"Starting file download - Directory: {dir}, File: {file}")
+        # Ensure connected
+        if not self._ctrl_channel.transport or not self._data_channel.transport:
+            await self.connect()
 
+        if self._busy:
+            raise RuntimeError("DS2FTP client is busy with another transfer")
+        self._busy = True
+        try:
+            return await self._download_file(dir, file, dest_path, DS2FTPCommand())
+        finally:
+            self._busy = False
+
+    async def download_files(
+        self, items: Iterable[tuple[int, int, str]]
+    ) -> list[int | None]:
+        """
+        Download several files from the server in one reservation of the client.
+
+        Args:
+            items: Tuples of (directory number, file number, local destination path)
+
+        Returns:
+            Number of bytes downloaded for each item, as download_file returns
+        """
         # Ensure connected
-        if not self._ctrl_channel.writer or not self._data_channel.writer:
+        if not self._ctrl_channel.transport or not self._data_channel.transport:
             await self.connect()
 
-        async with self._lock:
-            try:
-                # Reset processing state
-                self._reset_processing_info()
-
-                # Create and send RTS command (filesize=0 for download request)
-                cmd = DS2FTPCommand()
-                rts_data = cmd.make_rts(dir, file, 0)
-                if not await self.ctrl_send(rts_data):
-                    logger.error("Failed to send RTS")
-                    return 0
-
-                # Receive initial CTS response
-                logger.debug("Waiting for initial CTS from server")
-                initial_response_data = await self.ctrl_receive()
-                cmd = DS2FTPCommand()
-                cmd_type = cmd.parse_rx_buffer(
-                    initial_response_data, len(initial_response_data)
-                )
+        if self._busy:
+            raise RuntimeError("DS2FTP client is busy with another transfer")
+        self._busy = True
+        try:
+            cmd = DS2FTPCommand()
+            return [
+                await self._download_file(dir, file, dest_path, cmd)
+                for dir, file, dest_path in items
+            ]
+        finally:
+            self._busy = False
+
+    async def _download_file(
+        self, dir: int, file: int, dest_path: str, cmd: DS2FTPCommand
+    ) -> int | None:
+        """Download a file with the client already connected and reserved."""
+        logger.debug(f"Starting file download - Directory: {dir}, File: {file}")
 
-                if cmd_type != DS2FTPCommandType.CTS:
-                    logger.debug(f"Unexpected initial response type: {cmd_type}")
-                    return None
+        try:
+            # Reset processing state
+            self._reset_processing_info()
 
-                initial_cts = cmd.get_cts()
-                if not initial_cts:
-                    logger.error("Invalid initial CTS response")
-                    return None
+            await self._discard_stale()
 
-                # Record server's CTS values
-                received_cts = DS2FTPCTS()
-                received_cts.tsize = initial_cts.tsize
-                received_cts.fsize = initial_cts.fsize
-                received_cts.bsize = initial_cts.bsize
+            # Create and send RTS command (filesize=0 for download request)
+            rts_parts = DS2FTPCommand.make_rts_parts(dir, file, 0)
+            if not await self.ctrl_send_parts(rts_parts, drain=False):
+                logger.error("Failed to send RTS")
+                return 0
 
-                logger.debug(
-                    f"Received initial CTS: tsize={received_cts.tsize}, fsize={received_cts.fsize}, bsize={received_cts.bsize}"
-                )
+            # Receive initial CTS response
+            logger.debug("Waiting for initial CTS from server")
+            initial_response_data = await self.ctrl_receive()
+            # The given parser is reused for every CTS
+            cmd.reset()
+            cmd_type = cmd.parse_rx_buffer(
+                initial_response_data, len(initial_response_data)
+            )
+
+            if cmd_type != DS2FTPCommandType.CTS:
+                logger.debug(f"Unexpected initial response type: {cmd_type}")
+                return None
+
+            initial_cts = cmd.get_cts()
+            if not initial_cts:
+                logger.error("Invalid initial CTS response")
+                return None
 
-                # Set file information
-                self.mode = FileMode.GET
-                self.dir = dir
-                self.file = file
-                self.total = received_cts.tsize
-                self.done = received_cts.fsize
+            # Record server's CTS values
+            received_cts = DS2FTPCTS()
+            received_cts.tsize = initial_cts.tsize
+            received_cts.fsize = initial_cts.fsize
+            received_cts.bsize = initial_cts.bsize
 
-                if self.total < 1:
-                    logger.error("File empty")
-                    return 0
+            logger.debug(
+                f"Received initial CTS: tsize={received_cts.tsize}, fsize={received_cts.fsize}, bsize={received_cts.bsize}"
+            )
+
+            # Set file information
+            self.mode = FileMode.GET
+            self.dir = dir
+            self.file = file
+            self.total = received_cts.tsize
+            self.done = received_cts.fsize
+
+            if self.total < 1:
+                logger.error("File empty")
+                return 0
 
-                # Prepare for file writing
-                downloaded_size = 0
+            # Prepare for file writing
+            downloaded_size = 0
 
-                # Create parent directories if they don't exist
-                os.makedirs(os.path.dirname(os.path.abspath(dest_path)), exist_ok=True)
+            # Create parent directories if they don't exist
+            parent = os.path.dirname(dest_path)
+            if parent and parent not in self._ensured_dirs:
+                os.makedirs(parent, exist_ok=True)
+                self._ensured_dirs.add(parent)
 
-                with open(dest_path, "wb") as dest_file:
+            # Chunks are written in the background while the next one is
+            # received; at most one write is in flight at a time
+            loop = asyncio.get_running_loop()
+            pending_write: asyncio.Future[int] | None = None
+
+            with open(dest_path, "wb", buffering=1 << 20) as dest_file:
+                try:
                     # Send CTS acknowledgment (same values as received)
                     logger.debug(
                         f"Sending first CTS acknowledgment: tsize={received_cts.tsize}, fsize={received_cts.fsize}, bsize={received_cts.bsize}"
                     )
-                    cmd = DS2FTPCommand()
-                    cts_data = cmd.make_cts(
+                    cts_parts = DS2FTPCommand.make_cts_parts(
                         received_cts.tsize, received_cts.fsize, received_cts.bsize
                     )
-                    if not await self.ctrl_send(cts_data):
+                    if not await self.ctrl_send_parts(cts_parts, drain=False):
                         logger.error("Failed to send CTS acknowledgment")
                         return 0
 
                     while self.done < self.total:
                         # Receive data chunk
                         chunk_size = received_cts.bsize
-                        logger.debug(f"Receiving data chunk of size {chunk_size}")
+                        logger.debug("Receiving data chunk of size %d", chunk_size)
                         chunk_data = await self.data_receive(chunk_size)
                         if not chunk_data:
                             logger.error("Failed to receive data chunk")
                             break
 
                         # Write to file
-                        dest_file.write(chunk_data)
+                        if pending_write is not None:
+                            await pending_write
+                        pending_write = loop.run_in_executor(
+                            None, dest_file.write, chunk_data
+                        )
 
                         # Update progress
                         chunk_length = len(chunk_data)
@@ -448,7 +846,10 @@ class DS2FTPClient:
                         downloaded_size += chunk_length
 
                         logger.debug(
-                            f"Received data chunk: {chunk_length} bytes (Total: {downloaded_size}/{self.total})"
+                            "Received data chunk: %d bytes (Total: %d/%d)",
+                            chunk_length,
+                            downloaded_size,
+                            self.total,
                         )
 
                         if self.done >= self.total:
@@ -461,7 +862,7 @@ class DS2FTPClient:
                             next_response_data = await self.ctrl_receive(
                                 timeout=3.0
                             )  # Shorten timeout
-                            cmd = DS2FTPCommand()
+                            cmd.reset()
                             cmd_type = cmd.parse_rx_buffer(
                                 next_response_data, len(next_response_data)
                             )
@@ -485,7 +886,10 @@ class DS2FTPClient:
 
                             # Log received CTS
                             logger.debug(
-                                f"Received next CTS: tsize={next_cts.tsize}, fsize={next_cts.fsize}, bsize={next_cts.bsize}"
+                                "Received next CTS: tsize=%d, fsize=%d, bsize=%d",
+                                next_cts.tsize,
+                                next_cts.fsize,
+                                next_cts.bsize,
                             )
 
                             # Save received CTS
@@ -514,27 +918,33 @@ class DS2FTPClient:
                                 raise
 
                         # Send CTS acknowledgment (same values as received)
-                        logger.debug(
-                            f"Sending CTS acknowledgment: tsize={received_cts.tsize}, fsize={received_cts.fsize}, bsize={received_cts.bsize}"
-                        )
-                        cmd = DS2FTPCommand()
-                        cts_data = cmd.make_cts(
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug(
+                                "Sending CTS acknowledgment: tsize=%d, fsize=%d, bsize=%d",
+                                received_cts.tsize,
+                                received_cts.fsize,
+                                received_cts.bsize,
+                            )
+                        cts_parts = DS2FTPCommand.make_cts_parts(
                             received_cts.tsize, received_cts.fsize, received_cts.bsize
                         )
-                        if not await self.ctrl_send(cts_data):
+                        if not await self.ctrl_send_parts(cts_parts, drain=False):
                             logger.error("Failed to send CTS acknowledgment")
                             break
+                finally:
+                    if pending_write is not None:
+                        await pending_write
 
-                logger.debug(
-                    f"File download completed: {dest_path} ({downloaded_size} bytes)"
-                )
-                self._reset_processing_info()
-                return downloaded_size
+            logger.debug(
+                f"File download completed: {dest_path} ({downloaded_size} bytes)"
+            )
+            self._reset_processing_info()
+            return downloaded_size
 
-            except Exception as e:
-                logger.error(f"Download error: {e}")
-                self._reset_processing_info()
-                return 0
+        except Exception as e:
+            logger.error(f"Download error: {e}")
+            self._reset_processing_info()
+            return 0
 
     async def upload_file(self, src_path: str, dir: int, file: int) -> int:
         """
@@ -558,177 +968,217 @@ class DS2FTPClient:
             return 0
 
         # Ensure connected
-        if not self._ctrl_channel.writer or not self._data_channel.writer:
+        if not self._ctrl_channel.transport or not self._data_channel.transport:
             await self.connect()
 
-        async with self._lock:
-            try:
-                # Reset processing state
-                self._reset_processing_info()
-
-                # Create and send RTS command (filesize>0 for upload request)
-                cmd = DS2FTPCommand()
-                rts_data = cmd.make_rts(dir, file, file_size)
-                if not await self.ctrl_send(rts_data):
-                    logger.error("Failed to send RTS")
-                    return 0
-
-                # Receive CTS response
-                logger.debug("Waiting for initial CTS from server")
-                response_data = await self.ctrl_receive()
-                cmd = DS2FTPCommand()
-                cmd_type = cmd.parse_rx_buffer(response_data, len(response_data))
-
-                if cmd_type != DS2FTPCommandType.CTS:
-                    logger.error(f"Unexpected response type: {cmd_type}")
-                    return 0
-
-                initial_cts = cmd.get_cts()
-                if not initial_cts:
-                    logger.error("Invalid CTS response")
-                    return 0
-
-                logger.debug(
-                    f"Received initial CTS: tsize={initial_cts.tsize}, fsize={initial_cts.fsize}, bsize={initial_cts.bsize}"
-                )
+        if self._busy:
+            raise RuntimeError("DS2FTP client is busy with another transfer")
+        self._busy = True
+        try:
+            # Reset processing state
+            self._reset_processing_info()
 
-                # Set file information
-                self.mode = FileMode.PUT
-                self.dir = dir
-                self.file = file
-                self.total = initial_cts.tsize  # Use server's value
-                self.done = initial_cts.fsize  # Use server's value
+            await self._discard_stale()
 
-                # Prepare for file reading
-                uploaded_size = 0
+            # Create and send RTS command (filesize>0 for upload request)
+            rts_parts = DS2FTPCommand.make_rts_parts(dir, file, file_size)
+            if not await self.ctrl_send_parts(rts_parts, drain=False):
+                logger.error("Failed to send RTS")
+                return 0
 
-                with open(src_path, "rb") as src_file:
-                    # For uploads, receive CTS first then send data
-                    received_cts = initial_cts
+            # Receive CTS response
+            logger.debug("Waiting for initial CTS from server")
+            response_data = await self.ctrl_receive()
+            # One parser is reused for every CTS of this transfer
+            cmd = DS2FTPCommand()
+            cmd_type = cmd.parse_rx_buffer(response_data, len(response_data))
 
-                    while self.done < self.total:
-                        # Use server's bsize from CTS
-                        chunk_size = received_cts.bsize
-                        logger.debug(f"Preparing to send chunk of size {chunk_size}")
+            if cmd_type != DS2FTPCommandType.CTS:
+                logger.error(f"Unexpected response type: {cmd_type}")
+                return 0
 
-                        # Read data chunk
-                        src_file.seek(self.done)  # Seek to exact position
-                        chunk_data = src_file.read(chunk_size)
-                        if not chunk_data:
-                            logger.warning("End of file reached unexpectedly")
-                            break
+            initial_cts = cmd.get_cts()
+            if not initial_cts:
+                logger.error("Invalid CTS response")
+                return 0
 
-                        # Send data (using data channel)
-                        logger.debug(f"Sending data chunk: {len(chunk_data)} bytes")
-                        if not await self.data_send(chunk_data):
-                            logger.error("Failed to send data chunk")
-                            return uploaded_size
+            logger.debug(
+                f"Received initial CTS: tsize={initial_cts.tsize}, fsize={initial_cts.fsize}, bsize={initial_cts.bsize}"
+            )
 
-                        # Update progress
-                        chunk_length = len(chunk_data)
-                        self.done += chunk_length
-                        uploaded_size += chunk_length
+            # Set file information
+            self.mode = FileMode.PUT
+            self.dir = dir
+            self.file = file
+            self.total = initial_cts.tsize  # Use server's value
+            self.done = initial_cts.fsize  # Use server's value
 
-                        logger.debug(
-                            f"Sent data chunk: {chunk_length} bytes (Total: {uploaded_size}/{self.total})"
+            # Prepare for file reading
+            uploaded_size = 0
+
+            with open(src_path, "rb", buffering=0) as src_file:
+                # For uploads, receive CTS first then send data
+                received_cts = initial_cts
+
+                # Chunks follow each other, so only the start needs a seek
+                src_file.seek(self.done)
+
+                while self.done < self.total:
+                    # Use server's bsize from CTS
+                    chunk_size = received_cts.bsize
+                    logger.debug("Preparing to send chunk of size %d", chunk_size)
+
+                    # Send data chunk straight from the file (using data channel)
+                    chunk_length = await self.data_send_file(
+                        src_file, self.done, chunk_size
+                    )
+                    if not chunk_length:
+                        logger.warning("End of file reached unexpectedly")
+                        break
+
+                    # Update progress
+                    self.done += chunk_length
+                    uploaded_size += chunk_length
+
+                    logger.debug(
+                        "Sent data chunk: %d bytes (Total: %d/%d)",
+                        chunk_length,
+                        uploaded_size,
+                        self.total,
+                    )
+
+                    if self.done >= self.total:
+                        logger.debug("All data sent, upload complete")
+                        break
+
+                    # Have the kernel read the next chunk ahead while the
+                    # server acknowledges this one
+                    if hasattr(os, "posix_fadvise"):
+                        os.posix_fadvise(
+                            src_file.fileno(),
+                            self.done,
+                            chunk_size,
+                            os.POSIX_FADV_WILLNEED,
                         )
 
-                        if self.done >= self.total:
-                            logger.debug("All data sent, upload complete")
+                    # Receive next CTS
+                    logger.debug("Waiting for next CTS from server")
+                    try:
+                        response_data = await self.ctrl_receive(
+                            timeout=3.0
+                        )  # Shorten timeout
+                        cmd.reset()
+                        cmd_type = cmd.parse_rx_buffer(
+                            response_data, len(response_data)
+                        )
+
+                        if cmd_type != DS2FTPCommandType.CTS:
+                            if cmd_type == DS2FTPCommandType.ERRORCTS:
+                                err_cts = cmd.get_errorcts()
+                                logger.error(
+                                    f"Received ERRORCTS: {err_cts.error_msg if err_cts else 'Unknown error'}"
+                                )
+                            else:
+                                logger.error(f"Unexpected response type: {cmd_type}")
                             break
 
-                        # Receive next CTS
-                        logger.debug("Waiting for next CTS from server")
-                        try:
-                            response_data = await self.ctrl_receive(
-                                timeout=3.0
-                            )  # Shorten timeout
-                            cmd = DS2FTPCommand()
-                            cmd_type = cmd.parse_rx_buffer(
-                                response_data, len(response_data)
-                            )
+                        next_cts = cmd.get_cts()
+                        if not next_cts:
+                            logger.error("Invalid next CTS response")
+                            break
 
-                            if cmd_type != DS2FTPCommandType.CTS:
-                                if cmd_type == DS2FTPCommandType.ERRORCTS:
-                                    err_cts = cmd.get_errorcts()
-                                    logger.error(
-                                        f"Received ERRORCTS: {err_cts.error_msg if err_cts else 'Unknown error'}"
-                                    )
-                                else:
-                                    logger.error(
-                                        f"Unexpected response type: {cmd_type}"
-                                    )
-                                break
+                        # Log received CTS
+                        logger.debug(
+                            "Received next CTS: tsize=%d, fsize=%d, bsize=%d",
+                            next_cts.tsize,
+                            next_cts.fsize,
+                            next_cts.bsize,
+                        )
 
-                            next_cts = cmd.get_cts()
-                            if not next_cts:
-                                logger.error("Invalid next CTS response")
-                                break
+                        # Save received CTS for next iteration
+                        received_cts = next_cts
 
-                            # Log received CTS
+                        # Exit loop if all data sent
+                        if next_cts.fsize >= next_cts.tsize:
+                            logger.debug("Upload complete as indicated by server CTS")
+                            break
+                    except ConnectionError as e:
+                        # Handle cases where the server does not send the next CTS after the last data chunk is sent
+                        if (
+                            "timeout" in str(e).lower()
+                            and self.done >= self.total - chunk_length
+                        ):
                             logger.debug(
-                                f"Received next CTS: tsize={next_cts.tsize}, fsize={next_cts.fsize}, bsize={next_cts.bsize}"
+                                "Expected timeout after all data sent, upload complete"
                             )
+                            break
+                        else:
+                            logger.error(f"Connection error waiting for CTS: {e}")
+                            raise
 
-                            # Save received CTS for next iteration
-                            received_cts = next_cts
+            logger.debug(f"File upload completed: {uploaded_size} bytes")
+            self._reset_processing_info()
+            return uploaded_size
 
-                            # Exit loop if all data sent
-                            if next_cts.fsize >= next_cts.tsize:
-                                logger.debug(
-                                    "Upload complete as indicated by server CTS"
-                                )
-                                break
-                        except ConnectionError as e:
-                            # Handle cases where the server does not send the next CTS after the last data chunk is sent
-                            if (
-                                "timeout" in str(e).lower()
-                                and self.done >= self.total - chunk_length
-                            ):
-                                logger.debug(
-                                    "Expected timeout after all data sent, upload complete"
-                                )
-                                break
-                            else:
-                                logger.error(f"Connection error waiting for CTS: {e}")
-                                raise
+        except Exception as e:
+            logger.error(f"Upload error: {e}")
+            self._reset_processing_info()
+            return 0
+        finally:
+            self._busy = False
 
-                logger.debug(f"File upload completed: {uploaded_size} bytes")
-                self._reset_processing_info()
-                return uploaded_size
+    async def stat_file(self, dir: int, file: int) -> int | None:
+        """
+        Get the size of a file on the server without transferring it.
 
-            except Exception as e:
-                logger.error(f"Upload error: {e}")
-                self._reset_processing_info()
-                return 0
+        Sends a download RTS, takes the size from the initial CTS and aborts
+        the transfer with an error CTS instead of acknowledging it. Anything
+        the server sends for the aborted transfer is dropped before the
+        client can take its next request.
 
-    async def exists_file(self, dir: int, file: int) -> bool:
-        """Check if file exists on the server."""
-        logger.debug(f"Checking file existence - Directory: {dir}, File: {file}")
+        Args:
+            dir: Directory number
+            file: File number
 
-        try:
-            # Create a temporary file for the check
-            temp_file = os.path.join(
-                os.path.dirname(__file__), f"temp_check_{dir}_{file}"
-            )
-            try:
-                # Try to download to check existence
-                result = await self.download_file(dir, file, temp_file)
-                exists = result > 0
+        Returns:
+            File size in bytes, or None if the server refused the request
+        """
+        logger.debug("Getting file size - Directory: %d, File: %d", dir, file)
 
-                # Clean up temporary file
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
+        # Ensure connected
+        if not self._ctrl_channel.transport or not self._data_channel.transport:
+            await self.connect()
 
-                return exists
-            except Exception as e:
-                logger.error(f"Error checking file existence: {e}")
+        if self._busy:
+            raise RuntimeError("DS2FTP client is busy with another transfer")
+        self._busy = True
+        try:
+            await self._discard_stale()
+            rts_parts = DS2FTPCommand.make_rts_parts(dir, file, 0)
+            if not await self.ctrl_send_parts(rts_parts, drain=False):
+                logger.error("Failed to send RTS")
+                return None
+
+            response_data = await self.ctrl_receive()
+            cmd = DS2FTPCommand()
+            cmd_type = cmd.parse_rx_buffer(response_data, len(response_data))
+            if cmd_type != DS2FTPCommandType.CTS:
+                logger.debug("No CTS for file, response type: %s", cmd_type)
+                return None
+
+            cts = cmd.get_cts()
+            await self.send_error_cts(self.STAT_ABORT_CODE)
+            await self._settle_abort()
+            return cts.tsize if cts else None
+        finally:
+            self._busy = False
 
-                # Clean up temporary file
-                if os.path.exists(temp_file):
-                    os.unlink(temp_file)
+    async def exists_file(self, dir: int, file: int) -> bool:
+        """Check if file exists on the server."""
+        logger.debug(f"Checking file existence - Directory: {dir}, File: {file}")
 
-                return False
+        try:
+            return (await self.stat_file(dir, file) or 0) > 0
         except Exception as e:
             logger.error(f"File check error: {e}")
             return False
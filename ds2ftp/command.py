@@ -1,12 +1,20 @@
 from dataclasses import dataclass
 from enum import IntEnum
+from functools import lru_cache
 import logging
-from typing import ClassVar, Final
+import struct
+from typing import Callable, ClassVar, Final
 
 # Configure module logger
 logger = logging.getLogger(__name__)
 
 
+@lru_cache
+def _sum_struct(count: int) -> struct.Struct:
+    """Get the Struct unpacking count big-endian 32-bit words."""
+    return struct.Struct(f">{count}I")
+
+
 class DS2FTPCommandType(IntEnum):
     """DS2FTP Command Types enumeration."""
 
@@ -36,7 +44,7 @@ class ErrorCode(IntEnum):
     ERROR_UNKNOWN = 99
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DS2FTPDS2INFO:
     """DS2FTP DS2INFO data structure."""
 
@@ -49,7 +57,7 @@ class DS2FTPDS2INFO:
     wlanType: int = 0  # 4 bytes
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class DS2FTPRTS:
     """DS2FTP RTS (Request To Send) data structure."""
 
@@ -59,7 +67,7 @@ class DS2FTPRTS:
     serial: int = 0  # 4 bytes
 
 
-@dataclass
+@dataclass(slots=True)
 class DS2FTPCTS:
     """DS2FTP CTS (Clear To Send) data structure."""
 
@@ -68,7 +76,7 @@ class DS2FTPCTS:
     bsize: int = 0  # 4 bytes - block size
 
 
-@dataclass
+@dataclass(slots=True)
 class DS2FTPERRCTS:
     """DS2FTP ERRORCTS data structure."""
 
@@ -93,6 +101,16 @@ class DS2FTPChecksumError(DS2FTPProtocolError):
 class DS2FTPCommand:
     """DS2FTP Command Class for parsing and creating protocol commands."""
 
+    __slots__ = (
+        "cmdid",
+        "length",
+        "data",
+        "ds2ftp_ds2info",
+        "ds2ftp_rts",
+        "ds2ftp_cts",
+        "ds2ftp_errcts",
+    )
+
     # Protocol Constants
     DS2_HEADER: Final[bytes] = b"DS2\x00"  # 4 bytes header
     DS2FTP_CMD: ClassVar[list[int]] = [0, 1, 2, 3, 0x80000002]  # Command IDs
@@ -103,12 +121,48 @@ class DS2FTPCommand:
         0x18,
         0x18,
     ]  # Command lengths
+    # Command lengths by name, so callers skip the list lookup
+    _DS2INFO_LENGTH: ClassVar[int] = DS2FTP_CMD_LENGTH[1]
+    _RTS_LENGTH: ClassVar[int] = DS2FTP_CMD_LENGTH[2]
+    _CTS_LENGTH: ClassVar[int] = DS2FTP_CMD_LENGTH[3]
+    _ERRORCTS_LENGTH: ClassVar[int] = DS2FTP_CMD_LENGTH[4]
+    # Frame length by received command ID, as checked by confirm_length
+    CMD_LENGTH_MAP: ClassVar[dict[int, int]] = {
+        DS2FTPCommandType.DS2INFO.value: _DS2INFO_LENGTH,
+        DS2FTPCommandType.RTS.value: _RTS_LENGTH,
+        DS2FTPCommandType.CTS.value: _CTS_LENGTH,
+        DS2FTPCommandType.ERRORCTS.value: _ERRORCTS_LENGTH,
+    }
+    # Command type by received command ID
+    _COMMAND_TYPES: ClassVar[dict[int, DS2FTPCommandType]] = {
+        value: DS2FTPCommandType(value) for value in CMD_LENGTH_MAP
+    }
+    # Length of the shortest frame, read before the frame's type is known
+    MIN_CMD_LENGTH: ClassVar[int] = min(CMD_LENGTH_MAP.values())
+    # DS2 header and command ID at the start of every frame
+    HDR_TYPE: ClassVar[struct.Struct] = struct.Struct(">4sI")
+    # Fields following the command ID, in the order of the data structures
+    _DS2INFO_FIELDS: ClassVar[struct.Struct] = struct.Struct(">I6s2x8sII32sI")
+    _RTS_FIELDS: ClassVar[struct.Struct] = struct.Struct(">4I")
+    _CTS_FIELDS: ClassVar[struct.Struct] = struct.Struct(">3I")
+    _CHECKSUM_FIELD: ClassVar[struct.Struct] = struct.Struct(">I")
+
+    # Header and command type of the frames built in parts, with the sum of
+    # their two words for the checksum
+    _RTS_PREFIX: ClassVar[bytes] = DS2_HEADER + struct.pack(
+        ">I", DS2FTPCommandType.RTS.value
+    )
+    _RTS_PREFIX_SUM: ClassVar[int] = sum(struct.unpack(">II", _RTS_PREFIX))
+    _CTS_PREFIX: ClassVar[bytes] = DS2_HEADER + struct.pack(
+        ">I", DS2FTPCommandType.CTS.value
+    )
+    _CTS_PREFIX_SUM: ClassVar[int] = sum(struct.unpack(">II", _CTS_PREFIX))
 
     def __init__(self) -> None:
         """Initialize DS2FTP command."""
         self.cmdid: DS2FTPCommandType = DS2FTPCommandType.NONE
         self.length: int = 0
-        self.data: bytearray = bytearray()
+        self.data: memoryview = memoryview(b"")
 
         # Command-specific data structures
         self.ds2ftp_ds2info: DS2FTPDS2INFO | None = None
@@ -116,13 +170,23 @@ class DS2FTPCommand:
         self.ds2ftp_cts: DS2FTPCTS | None = None
         self.ds2ftp_errcts: DS2FTPERRCTS | None = None
 
+    def reset(self) -> None:
+        """Clear parsed state so the command can parse another buffer."""
+        self.cmdid = DS2FTPCommandType.NONE
+        self.length = 0
+        self.data = memoryview(b"")
+        self.ds2ftp_ds2info = None
+        self.ds2ftp_rts = None
+        self.ds2ftp_cts = None
+        self.ds2ftp_errcts = None
+
     @staticmethod
-    def _calculate_checksum(data: bytes) -> int:
+    def _calculate_checksum(data: bytes | bytearray | memoryview) -> int:
         """
         Calculate checksum for byte data.
 
         Args:
-            data: Byte data to calculate checksum for
+            data: Byte data to calculate checksum for, views are not copied
 
         Returns:
             32-bit checksum value
@@ -130,23 +194,16 @@ class DS2FTPCommand:
         # Get data length
         length = len(data)
 
-        # Initialize sum
-        sum_value = 0
-
-        # Process 4 bytes at a time
-        for i in range(0, length // 4):
-            value = int.from_bytes(data[i * 4 : i * 4 + 4], byteorder="big")
-            sum_value = (sum_value + value) & 0xFFFFFFFF  # Limit to 32 bits
+        # Sum 4 bytes at a time
+        words, remaining_bytes = divmod(length, 4)
+        sum_value = sum(_sum_struct(words).unpack_from(data))
 
-        # Process remaining bytes
-        remaining_bytes = length % 4
+        # Process remaining bytes, padded with zeros
         if remaining_bytes:
-            # Add padding for remaining bytes
-            remaining_data = data[length - remaining_bytes :] + bytes(
-                [0] * (4 - remaining_bytes)
-            )
-            value = int.from_bytes(remaining_data, byteorder="big")
-            sum_value = (sum_value + value) & 0xFFFFFFFF
+            value = int.from_bytes(data[length - remaining_bytes :], byteorder="big")
+            sum_value += value << (8 * (4 - remaining_bytes))
+
+        sum_value &= 0xFFFFFFFF  # Limit to 32 bits
 
         # Checksum is bit-wise NOT of the sum
         return ~sum_value & 0xFFFFFFFF
@@ -166,8 +223,8 @@ class DS2FTPCommand:
             logger.error("Command already set")
             return DS2FTPCommandType.NONE
 
-        # Clear and set data
-        self.data = bytearray(buffer[:length])
+        # Keep a view of the frame, parsing only reads it
+        self.data = memoryview(buffer)[:length]
         self.length = length
 
         # Parse header
@@ -176,20 +233,10 @@ class DS2FTPCommand:
             return DS2FTPCommandType.NONE
 
         # Extract opcode (big endian)
-        opcode = int.from_bytes(buffer[4:8], "big")
-        self.cmdid = DS2FTPCommandType.NONE
+        _, opcode = self.HDR_TYPE.unpack_from(self.data)
 
         # Find command
-        for i, cmd_id in enumerate(self.DS2FTP_CMD):
-            if cmd_id == opcode:
-                try:
-                    self.cmdid = DS2FTPCommandType(cmd_id)
-                    break
-                except ValueError:
-                    # Handle special value (0x80000002)
-                    if cmd_id == 0x80000002:
-                        self.cmdid = DS2FTPCommandType.ERRORCTS
-                        break
+        self.cmdid = self._COMMAND_TYPES.get(opcode, DS2FTPCommandType.NONE)
 
         if self.cmdid == DS2FTPCommandType.NONE:
             logger.error("Invalid command ERROR")
@@ -200,19 +247,8 @@ class DS2FTPCommand:
             self.cmdid == DS2FTPCommandType.ERRORCTS or self.confirm_checksum()
         ):
             # Parse command-specific data
-            if self.cmdid == DS2FTPCommandType.DS2INFO:
-                logger.debug("Receive DS2INFO")
-                self.parse_ds2info(buffer)
-            elif self.cmdid == DS2FTPCommandType.RTS:
-                logger.debug("Receive RTS")
-                self.parse_rts(buffer)
-            elif self.cmdid == DS2FTPCommandType.CTS:
-                logger.debug("Receive CTS")
-                self.parse_cts(buffer)
-            elif self.cmdid == DS2FTPCommandType.ERRORCTS:
-                self.parse_errorcts(buffer)
-            else:
-                logger.error("Undefined command ERROR")
+            logger.debug("Receive %s", self.cmdid.name)
+            self._PARSERS[self.cmdid](self, self.data)
         else:
             logger.error("Command confirm ERROR")
             self.cmdid = DS2FTPCommandType.NONE
@@ -221,113 +257,78 @@ class DS2FTPCommand:
 
     def confirm_length(self) -> bool:
         """Confirm if command length is valid."""
-        cmd_index = 0
-
-        if self.cmdid == DS2FTPCommandType.DS2INFO:
-            cmd_index = 1
-        elif self.cmdid == DS2FTPCommandType.RTS:
-            cmd_index = 2
-        elif self.cmdid == DS2FTPCommandType.CTS:
-            cmd_index = 3
-        elif self.cmdid == DS2FTPCommandType.ERRORCTS:
-            cmd_index = 4
+        if self.cmdid == DS2FTPCommandType.ERRORCTS:
             return True  # ERRORCTS has variable length
-        else:
+
+        expected_length = self.CMD_LENGTH_MAP.get(self.cmdid)
+        if expected_length is None:
             logger.error("Cannot confirm length: Undefined command")
             return False
 
-        expected_length = self.DS2FTP_CMD_LENGTH[cmd_index]
-
         if self.length != expected_length:
-            logger.error(f"ConfirmLength Error: {self.cmdid}")
+            logger.error("ConfirmLength Error: %s", self.cmdid)
             return False
         return True
 
     def confirm_checksum(self) -> bool:
         """Confirm if checksum is valid."""
-        if self.length < 4:
+        # Offset of the checksum in the last 4 bytes
+        end = self.length - 4
+        if end < 0:
             return False
 
-        # Data without checksum
-        data_without_checksum = bytes(self.data[:-4])
-
-        # Calculate checksum
-        calculated_checksum = self._calculate_checksum(data_without_checksum)
+        calculated_checksum = self._calculate_checksum(self.data[:end])
+        (received_checksum,) = self._CHECKSUM_FIELD.unpack_from(self.data, end)
+        if calculated_checksum == received_checksum:
+            return True
 
-        # Get checksum from last 4 bytes
-        received_checksum = int.from_bytes(self.data[-4:], byteorder="big")
-
-        if calculated_checksum != received_checksum:
-            logger.error(
-                f"Checksum Error: calculated=0x{calculated_checksum:08x}, received=0x{received_checksum:08x}"
-            )
-            return False
-
-        return True
+        logger.error(
+            "Checksum Error: calculated=0x%08x, received=0x%08x",
+            calculated_checksum,
+            received_checksum,
+        )
+        return False
 
-    def parse_ds2info(self, buffer: bytes) -> bool:
+    def parse_ds2info(self, buffer: bytes | memoryview) -> bool:
         """Parse DS2INFO command data."""
-        cmd_index = 1  # DS2INFO
-        if len(buffer) < self.DS2FTP_CMD_LENGTH[cmd_index]:
+        if len(buffer) < self._DS2INFO_LENGTH:
             return False
 
         self.ds2ftp_ds2info = DS2FTPDS2INFO(
-            ds2addr=int.from_bytes(buffer[8:12], "big"),
-            ds2macaddr=buffer[12:18],
-            ds2serial=buffer[20:28],
-            throughput=int.from_bytes(buffer[28:32], "big"),
-            tokenGroupNo=int.from_bytes(buffer[32:36], "big"),
-            apEssid=buffer[36:68],
-            wlanType=int.from_bytes(buffer[68:72], "big"),
+            *self._DS2INFO_FIELDS.unpack_from(buffer, 8)
         )
 
         return True
 
-    def parse_rts(self, buffer: bytes) -> bool:
+    def parse_rts(self, buffer: bytes | memoryview) -> bool:
         """Parse RTS command data."""
-        cmd_index = 2  # RTS
-        if len(buffer) < self.DS2FTP_CMD_LENGTH[cmd_index]:
+        if len(buffer) < self._RTS_LENGTH:
             return False
 
-        self.ds2ftp_rts = DS2FTPRTS(
-            dirno=int.from_bytes(buffer[8:12], "big"),
-            fileno=int.from_bytes(buffer[12:16], "big"),
-            filesize=int.from_bytes(buffer[16:20], "big"),
-            serial=int.from_bytes(buffer[20:24], "big"),
-        )
+        self.ds2ftp_rts = DS2FTPRTS(*self._RTS_FIELDS.unpack_from(buffer, 8))
 
         return True
 
-    def parse_cts(self, buffer: bytes) -> bool:
+    def parse_cts(self, buffer: bytes | memoryview) -> bool:
         """Parse CTS command data."""
-        cmd_index = 3  # CTS
-        if len(buffer) < self.DS2FTP_CMD_LENGTH[cmd_index]:
+        if len(buffer) < self._CTS_LENGTH:
             return False
 
-        self.ds2ftp_cts = DS2FTPCTS(
-            tsize=int.from_bytes(buffer[8:12], "big"),
-            fsize=int.from_bytes(buffer[12:16], "big"),
-            bsize=int.from_bytes(buffer[16:20], "big"),
-        )
+        self.ds2ftp_cts = DS2FTPCTS(*self._CTS_FIELDS.unpack_from(buffer, 8))
 
         return True
 
-    def parse_errorcts(self, buffer: bytes) -> bool:
+    def parse_errorcts(self, buffer: bytes | memoryview) -> bool:
         """Parse ERRORCTS command data."""
-        cmd_index = 4  # ERRORCTS
-        if len(buffer) < self.DS2FTP_CMD_LENGTH[cmd_index]:
+        if len(buffer) < self._ERRORCTS_LENGTH:
             return False
 
-        self.ds2ftp_errcts = DS2FTPERRCTS(
-            tsize=int.from_bytes(buffer[8:12], "big"),
-            fsize=int.from_bytes(buffer[12:16], "big"),
-            bsize=int.from_bytes(buffer[16:20], "big"),
-        )
+        self.ds2ftp_errcts = DS2FTPERRCTS(*self._CTS_FIELDS.unpack_from(buffer, 8))
 
         # Parse error message (variable length)
         if len(buffer) > 24:
             # Read until null byte or newline
-            error_bytes = buffer[24:]
+            error_bytes = bytes(buffer[24:])
             try:
                 end_index = error_bytes.index(b"\n")
                 self.ds2ftp_errcts.error_msg = error_bytes[:end_index].decode("utf-8")
@@ -339,76 +340,54 @@ class DS2FTPCommand:
 
         return True
 
+    # Parser of each received command type
+    _PARSERS: ClassVar[
+        dict[DS2FTPCommandType, Callable[["DS2FTPCommand", bytes | memoryview], bool]]
+    ] = {
+        DS2FTPCommandType.DS2INFO: parse_ds2info,
+        DS2FTPCommandType.RTS: parse_rts,
+        DS2FTPCommandType.CTS: parse_cts,
+        DS2FTPCommandType.ERRORCTS: parse_errorcts,
+    }
+
     def make_ds2info(self) -> bytes:
         """Create DS2INFO command."""
         raise NotImplementedError("DS2INFO creation not implemented")
 
+    @classmethod
+    def make_rts_parts(
+        cls, dirno: int, fileno: int, filesize: int = 0, serial: int = 0
+    ) -> tuple[bytes, bytes]:
+        """Create RTS command as its shared header part and its body."""
+        checksum = ~(cls._RTS_PREFIX_SUM + dirno + fileno + filesize + serial)
+        body = struct.pack(
+            ">5I", dirno, fileno, filesize, serial, checksum & 0xFFFFFFFF
+        )
+        return cls._RTS_PREFIX, body
+
+    @classmethod
+    def make_cts_parts(cls, tsize: int, fsize: int, bsize: int) -> tuple[bytes, bytes]:
+        """Create CTS command as its shared header part and its body."""
+        checksum = ~(cls._CTS_PREFIX_SUM + tsize + fsize + bsize)
+        body = struct.pack(">4I", tsize, fsize, bsize, checksum & 0xFFFFFFFF)
+        return cls._CTS_PREFIX, body
+
     def make_rts(
         self, dirno: int, fileno: int, filesize: int = 0, serial: int = 0
     ) -> bytes:
         """Create RTS command."""
-        # RTS command index and length
-        cmd_index = 2  # RTS
-        length = self.DS2FTP_CMD_LENGTH[cmd_index]
-
-        # Prepare buffer
-        buffer = bytearray(length)
-
-        # DS2 header
-        buffer[0:4] = self.DS2_HEADER
-
-        # Command type
-        buffer[4:8] = DS2FTPCommandType.RTS.value.to_bytes(4, "big")
-
-        # Data fields
-        buffer[8:12] = dirno.to_bytes(4, "big")
-        buffer[12:16] = fileno.to_bytes(4, "big")
-        buffer[16:20] = filesize.to_bytes(4, "big")
-        buffer[20:24] = serial.to_bytes(4, "big")
-
-        # Calculate checksum
-        checksum = self._calculate_checksum(buffer[:-4])
-
-        # Set checksum
-        buffer[-4:] = checksum.to_bytes(4, "big")
-
-        return bytes(buffer)
+        return b"".join(self.make_rts_parts(dirno, fileno, filesize, serial))
 
     def make_cts(self, tsize: int, fsize: int, bsize: int) -> bytes:
         """Create CTS command."""
-        # CTS command index and length
-        cmd_index = 3  # CTS
-        length = self.DS2FTP_CMD_LENGTH[cmd_index]
-
-        # Prepare buffer
-        buffer = bytearray(length)
-
-        # DS2 header
-        buffer[0:4] = self.DS2_HEADER
-
-        # Command type
-        buffer[4:8] = DS2FTPCommandType.CTS.value.to_bytes(4, "big")
-
-        # Data fields
-        buffer[8:12] = tsize.to_bytes(4, "big")
-        buffer[12:16] = fsize.to_bytes(4, "big")
-        buffer[16:20] = bsize.to_bytes(4, "big")
-
-        # Calculate checksum
-        checksum = self._calculate_checksum(buffer[:-4])
-
-        # Set checksum
-        buffer[-4:] = checksum.to_bytes(4, "big")
-
-        return bytes(buffer)
+        return b"".join(self.make_cts_parts(tsize, fsize, bsize))
 
     def make_errorcts(
         self, tsize: int, fsize: int, bsize: int, error_msg: str = ""
     ) -> bytes:
         """Create ERRORCTS command."""
-        # ERRORCTS command index and length
-        cmd_index = 4  # ERRORCTS
-        min_length = self.DS2FTP_CMD_LENGTH[cmd_index]
+        # ERRORCTS length without the message
+        min_length = self._ERRORCTS_LENGTH
 
         # Adjust length for error message
         msg_bytes = error_msg.encode("utf-8") + b"\n" if error_msg else b""
@@ -422,26 +401,19 @@ class DS2FTPCommand:
         # Prepare buffer
         buffer = bytearray(length)
 
-        # DS2 header
-        buffer[0:4] = self.DS2_HEADER
-
-        # Command type
-        buffer[4:8] = DS2FTPCommandType.ERRORCTS.value.to_bytes(4, "big")
-
-        # Data fields
-        buffer[8:12] = tsize.to_bytes(4, "big")
-        buffer[12:16] = fsize.to_bytes(4, "big")
-        buffer[16:20] = bsize.to_bytes(4, "big")
+        # DS2 header, command type and data fields
+        self.HDR_TYPE.pack_into(
+            buffer, 0, self.DS2_HEADER, DS2FTPCommandType.ERRORCTS.value
+        )
+        self._CTS_FIELDS.pack_into(buffer, 8, tsize, fsize, bsize)
 
         # Add error message if present
         if msg_bytes:
             buffer[24 : 24 + len(msg_bytes)] = msg_bytes
 
-        # Calculate checksum
-        checksum = self._calculate_checksum(buffer[:-4])
-
-        # Set checksum
-        buffer[-4:] = checksum.to_bytes(4, "big")
+        # Calculate and set checksum
+        checksum = self._calculate_checksum(memoryview(buffer)[:-4])
+        self._CHECKSUM_FIELD.pack_into(buffer, length - 4, checksum)
 
         return bytes(buffer)
 
@@ -1,12 +1,17 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from io import BufferedReader, BufferedWriter, BytesIO
+from io import BufferedReader, BufferedWriter
 import os
+import struct
+from typing import Final
 
 from . import ApduType
 
+# APDU type and payload length
+_HEADER: Final[struct.Struct] = struct.Struct(">HH")
 
-@dataclass
+
+@dataclass(slots=True)
 class ApduBase(ABC):
     """APDU Base Class"""
 
@@ -20,15 +25,32 @@ class ApduBase(ABC):
         Returns:
             tuple[ApduType, bytes]: ApduType and Payload
         """
-        buffer = stream.read(4)
-        if len(buffer) < 4:
+        buffer = stream.read(_HEADER.size)
+        if len(buffer) < _HEADER.size:
             stream.seek(-len(buffer), os.SEEK_CUR)
             raise ValueError("Reached to End of File.")
-        apdu_type = ApduType(int.from_bytes(buffer[0:2], "big"))
-        size = int.from_bytes(buffer[2:4], "big")
+        apdu_type_value, size = _HEADER.unpack(buffer)
+        apdu_type = ApduType(apdu_type_value)
         payload = stream.read(size)
         return apdu_type, payload
 
+    @staticmethod
+    def _view_common(data: bytes | memoryview) -> tuple[ApduType, memoryview]:
+        """View Common Part
+
+        Args:
+            data: APDU header and payload
+
+        Returns:
+            tuple[ApduType, memoryview]: ApduType and a view of the Payload
+        """
+        if len(data) < _HEADER.size:
+            raise ValueError("Reached to End of File.")
+        apdu_type_value, size = _HEADER.unpack_from(data)
+        apdu_type = ApduType(apdu_type_value)
+        payload = memoryview(data)[_HEADER.size : _HEADER.size + size]
+        return apdu_type, payload
+
     @abstractmethod
     def _apdu_type(self) -> ApduType:
         """APDU Type
@@ -53,19 +75,18 @@ class ApduBase(ABC):
         Args:
             stream (BufferedWriter): Output stream
         """
-        payload_buffer = self._payload_buffer()
+        stream.write(self.to_bytes())
 
-        stream.write(self._apdu_type().value.to_bytes(2, "big"))
-        stream.write(len(payload_buffer).to_bytes(2, "big"))
-        stream.write(payload_buffer)
-
-    def to_bytes(self) -> bytes:
+    def to_bytes(self) -> bytearray:
         """To bytes
 
         Returns:
-            bytes: This instance as bytes
+            bytearray: This instance as bytes
         """
-        stream = BytesIO()
-        self.write(stream)
-        stream.seek(0)
-        return stream.read()
+        payload_buffer = self._payload_buffer()
+
+        # Header and payload in one buffer
+        buffer = bytearray(_HEADER.size + len(payload_buffer))
+        _HEADER.pack_into(buffer, 0, self._apdu_type().value, len(payload_buffer))
+        buffer[_HEADER.size :] = payload_buffer
+        return buffer
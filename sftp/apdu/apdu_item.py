@@ -5,7 +5,7 @@ from typing import Self
 from . import ApduItemType
 
 
-@dataclass
+@dataclass(slots=True)
 class ApduItem:
     """APDU Item"""
 
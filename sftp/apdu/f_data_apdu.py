@@ -5,11 +5,11 @@ from typing import Self
 from . import ApduType, ApduBase
 
 
-@dataclass
+@dataclass(slots=True)
 class FDataApdu(ApduBase):
     """F_Data APDU"""
 
-    data: bytes
+    data: bytes | memoryview
 
     @classmethod
     def read(cls, stream: BufferedReader) -> Self:
@@ -26,8 +26,25 @@ class FDataApdu(ApduBase):
             raise ValueError(f"Invalid APDU Type: {apdu_type}")
         return cls(payload)
 
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview) -> Self:
+        """From bytes
+
+        The payload is kept as a view of data, not copied.
+
+        Args:
+            data: APDU header and payload
+
+        Returns:
+            Self: F_Data APDU
+        """
+        apdu_type, payload = ApduBase._view_common(data)
+        if apdu_type != ApduType.F_DATA:
+            raise ValueError(f"Invalid APDU Type: {apdu_type}")
+        return cls(payload)
+
     def _apdu_type(self) -> ApduType:
         return ApduType.F_DATA
 
-    def _payload_buffer(self) -> bytes:
+    def _payload_buffer(self) -> bytes | memoryview:
         return self.data
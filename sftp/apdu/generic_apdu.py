@@ -1,11 +1,15 @@
 from dataclasses import dataclass
-from io import BufferedReader, BytesIO
-from typing import Self
+from io import BufferedReader
+import struct
+from typing import Final, Self
 
 from . import ApduType, ApduBase, ApduItemType, ApduItem
 
+# Item type and data length
+_ITEM_HEADER: Final[struct.Struct] = struct.Struct(">HH")
 
-@dataclass
+
+@dataclass(slots=True)
 class GenericApdu(ApduBase):
     """Generic APDU"""
 
@@ -19,15 +23,28 @@ class GenericApdu(ApduBase):
         if apdu_type == ApduType.F_DATA:
             raise ValueError("Invalid APDU Type: F_DATA")
 
+        # Walk the items by offset over the payload
         items = []
-        payload_stream = BytesIO(payload)
+        header_size = _ITEM_HEADER.size
+        payload_length = len(payload)
+        offset = 0
 
-        while payload_stream.tell() < len(payload):
+        while offset < payload_length:
+            if payload_length - offset < header_size:
+                raise ValueError("Failed to read APDU item: Invalid item header")
+            item_type, item_len = _ITEM_HEADER.unpack_from(payload, offset)
+            offset += header_size
+            if payload_length - offset < item_len:
+                raise ValueError("Failed to read APDU item: Invalid item data length")
             try:
-                item = ApduItem.read(payload_stream)
-                items.append(item)
+                items.append(
+                    ApduItem(
+                        ApduItemType(item_type), payload[offset : offset + item_len]
+                    )
+                )
             except ValueError as e:
                 raise ValueError(f"Failed to read APDU item: {e}")
+            offset += item_len
 
         return cls(apdu_type, items)
 
@@ -35,11 +52,17 @@ class GenericApdu(ApduBase):
         return self.type
 
     def _payload_buffer(self) -> bytes:
-        buffer = BytesIO()
+        # Items are packed into a buffer of the final size
+        header_size = _ITEM_HEADER.size
+        buffer = bytearray(sum(header_size + len(item.data) for item in self.items))
+        offset = 0
         for item in self.items:
-            item.write(buffer)
-        buffer.seek(0)
-        return buffer.read()
+            data_length = len(item.data)
+            _ITEM_HEADER.pack_into(buffer, offset, item.type.value, data_length)
+            offset += header_size
+            buffer[offset : offset + data_length] = item.data
+            offset += data_length
+        return buffer
 
     def get_item(self, item_type: ApduItemType) -> bytes | None:
         """Get item data by type"""
@@ -1,8 +1,6 @@
 from collections.abc import Iterable
 from typing import Final
 
-__BIT_COUNT_TABLE = [bin(i).count("1") for i in range(256)]
-
 __NIBBLE_HIGH: Final[int] = 0xF0
 __NIBBLE_LOW: Final[int] = 0x0F
 __PAIR_HIGH: Final[int] = 0xCC
@@ -11,6 +9,20 @@ __ODD_BITS: Final[int] = 0xAA
 __EVEN_BITS: Final[int] = 0x55
 
 
+def __reverse_byte(value: int) -> int:
+    # Step 1: Swap nibbles (4 bits)
+    value = ((value & __NIBBLE_HIGH) >> 4) | ((value & __NIBBLE_LOW) << 4)
+
+    # Step 2: Swap pairs of bits
+    value = ((value & __PAIR_HIGH) >> 2) | ((value & __PAIR_LOW) << 2)
+
+    # Step 3: Swap adjacent bits
+    return ((value & __ODD_BITS) >> 1) | ((value & __EVEN_BITS) << 1)
+
+
+__REVERSE_TABLE: Final[bytes] = bytes(__reverse_byte(i) for i in range(256))
+
+
 def get_bit(data: bytes | bytearray | Iterable[int], pos: int) -> int:
     data = bytearray(data)
 
@@ -23,16 +35,18 @@ def get_bit(data: bytes | bytearray | Iterable[int], pos: int) -> int:
 
 
 def count_set_bits(data: bytes | bytearray | Iterable[int]) -> int:
-    data = bytearray(data)
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        data = bytes(data)
 
-    return sum(__BIT_COUNT_TABLE[byte] for byte in data)
+    # Popcount of all bytes at once
+    return int.from_bytes(data, "big").bit_count()
 
 
 def reverse_bits(buffer: bytes | bytearray | Iterable[int]) -> bytearray:
     """Reverse the bits in each byte of the input buffer.
 
-    This function reverses the bits in each byte using an optimized algorithm
-    that performs the reversal in three steps using masks and shifts.
+    This function maps each byte through a precomputed 256-entry table with
+    bytes.translate, so the whole buffer is processed in C.
 
     Args:
         buffer: Input bytes, bytearray, or iterable of integers
@@ -47,39 +61,23 @@ def reverse_bits(buffer: bytes | bytearray | Iterable[int]) -> bytearray:
         b'\\x55'
 
     Note:
-        The algorithm uses the following steps for each byte:
+        The table is built with the following steps for each byte:
         1. Swap nibbles (4 bits)
         2. Swap pairs of bits
         3. Swap adjacent bits
     """
-    # Pre-allocate bytearray for better performance
-    result = bytearray(len(buffer))
-
-    for i, value in enumerate(buffer):
-        # Step 1: Swap nibbles (4 bits)
-        value = ((value & __NIBBLE_HIGH) >> 4) | ((value & __NIBBLE_LOW) << 4)
-
-        # Step 2: Swap pairs of bits
-        value = ((value & __PAIR_HIGH) >> 2) | ((value & __PAIR_LOW) << 2)
-
-        # Step 3: Swap adjacent bits
-        value = ((value & __ODD_BITS) >> 1) | ((value & __EVEN_BITS) << 1)
-
-        result[i] = value
-
-    return result
+    if isinstance(buffer, bytearray):
+        return buffer.translate(__REVERSE_TABLE)
+    return bytearray(bytes(buffer).translate(__REVERSE_TABLE))
 
 
 def rotate_bits(data: bytearray, count: int):
     n_bits = len(data) * 8
-    result = bytearray(len(data))
-    for i in range(len(result)):
-        mask = 0x80
-        for _ in range(8):
-            bit = get_bit(data, count)
-            if bit != 0:
-                result[i] |= mask
-            mask >>= 1
-            count = (count + 1) % n_bits
-
-    return result
+    if not n_bits:
+        return bytearray()
+
+    # Rotate the whole buffer left as one big-endian integer
+    count %= n_bits
+    value = int.from_bytes(data, "big")
+    rotated = ((value << count) | (value >> (n_bits - count))) & ((1 << n_bits) - 1)
+    return bytearray(rotated.to_bytes(len(data), "big"))
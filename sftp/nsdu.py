@@ -1,13 +1,17 @@
 from dataclasses import dataclass
 from io import BufferedReader, BufferedWriter, BytesIO
 import os
-from typing import Self
+import struct
+from typing import Final, Self
 import zlib
 
 from .apdu import ApduType, ApduBase, GenericApdu, FDataApdu
 from .network_type import NetworkType
 
-@dataclass
+# APDU length and CRC fields
+_UINT16: Final[struct.Struct] = struct.Struct(">H")
+
+@dataclass(slots=True)
 class Nsdu:
     """NSDU (Network Service Data Unit) Class"""
 
@@ -49,7 +53,7 @@ class Nsdu:
             if len(crc_bytes) == 2:
                 # Verify CRC
                 expected_crc = int.from_bytes(crc_bytes, "big")
-                actual_crc = zlib.crc32(length_bytes + apdu_data) & 0xFFFF
+                actual_crc = zlib.crc32(apdu_data, zlib.crc32(length_bytes)) & 0xFFFF
                 if expected_crc != actual_crc:
                     raise ValueError("CRC mismatch")
                 network = NetworkType.NB
@@ -65,56 +69,136 @@ class Nsdu:
         if not etx or etx[0] != 0x03:
             raise ValueError("Invalid ETX")
 
-        # Restore APDU
-        apdu_stream = BytesIO(apdu_data)
+        return cls(cls._read_apdu(apdu_data), network)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, network: NetworkType) -> Self:
+        """Parse NSDU from a complete frame
+
+        Args:
+            data: Frame from STX to ETX
+            network: Network type of the frame, NB frames carry a CRC
+
+        Returns:
+            Self: NSDU instance
+
+        Raises:
+            ValueError: If invalid format or checksum error
+        """
+        # Check STX
+        if not data or data[0] != 0x02:
+            raise ValueError("Invalid STX")
+
+        # Read APDU length
+        if len(data) < 3:
+            raise ValueError("Failed to read length")
+        (apdu_len,) = _UINT16.unpack_from(data, 1)
+
+        # Check the frame holds the APDU data, CRC and ETX
+        data_end = 3 + apdu_len
+        has_crc = network == NetworkType.NB
+        if len(data) != data_end + (2 if has_crc else 0) + 1:
+            raise ValueError("Failed to read APDU data")
+        apdu_data = memoryview(data)[3:data_end]
+
+        # Verify CRC
+        if has_crc:
+            (expected_crc,) = _UINT16.unpack_from(data, data_end)
+            actual_crc = zlib.crc32(memoryview(data)[1:data_end]) & 0xFFFF
+            if expected_crc != actual_crc:
+                raise ValueError("CRC mismatch")
+
+        # Check ETX
+        if data[-1] != 0x03:
+            raise ValueError("Invalid ETX")
+
+        return cls(cls._read_apdu(apdu_data), network)
+
+    @staticmethod
+    def _read_apdu(apdu_data: bytes | memoryview) -> ApduBase:
+        """Restore APDU from its bytes
+
+        F_DATA payloads are kept as views of apdu_data.
+
+        Args:
+            apdu_data: APDU header and payload
+
+        Returns:
+            ApduBase: F_DATA or generic APDU
+
+        Raises:
+            ValueError: If the APDU is invalid
+        """
         try:
             if apdu_data[0:2] == ApduType.F_DATA.value.to_bytes(2, "big"):
-                apdu = FDataApdu.read(apdu_stream)
-            else:
-                apdu = GenericApdu.read(apdu_stream)
+                return FDataApdu.from_bytes(apdu_data)
+            return GenericApdu.read(BytesIO(apdu_data))
         except ValueError as e:
             raise ValueError(f"Failed to read APDU: {e}")
 
-        return cls(apdu, network)
-
     def write(self, stream: BufferedWriter) -> None:
         """Write NSDU to stream
 
         Args:
             stream (BufferedWriter): Output stream
 
+        Raises:
+            ValueError: If APDU is too large
+        """
+        stream.write(self.to_bytes())
+
+    def to_bytes(self) -> bytearray:
+        """Convert NSDU to bytes
+
+        Returns:
+            bytearray: NSDU as bytes
+
         Raises:
             ValueError: If APDU is too large
         """
         # Get APDU data first
         apdu_data = self.apdu.to_bytes()
         apdu_len = len(apdu_data)
+        if apdu_len > 0xFFFF:
+            raise ValueError(f"APDU too large: {apdu_len} bytes")
+
+        # Build the whole frame in one buffer: STX, length, APDU, CRC, ETX
+        has_crc = self.network == NetworkType.NB
+        data_end = 3 + apdu_len
+        frame = bytearray(data_end + (2 if has_crc else 0) + 1)
+        frame[0] = 0x02
+        _UINT16.pack_into(frame, 1, apdu_len)
+        frame[3:data_end] = apdu_data
+
+        # CRC for NB network
+        if has_crc:
+            # Calculate CRC-16 (Length + Data)
+            crc = zlib.crc32(memoryview(frame)[1:data_end]) & 0xFFFF
+            _UINT16.pack_into(frame, data_end, crc)
 
-        # Write STX
-        stream.write(b"\x02")
+        frame[-1] = 0x03
+        return frame
 
-        # Write APDU length
-        stream.write(apdu_len.to_bytes(2, "big"))
+    def to_parts(self) -> list[bytes | bytearray]:
+        """Convert NSDU to parts for a vectored write
 
-        # Write APDU data
-        stream.write(apdu_data)
+        The APDU bytes are passed through without being copied into a frame.
 
-        # Write CRC for NB network
-        if self.network == NetworkType.NB:
-            # Calculate CRC-16 (Length + Data)
-            crc = zlib.crc32(apdu_len.to_bytes(2, "big") + apdu_data) & 0xFFFF
-            stream.write(crc.to_bytes(2, "big"))
+        Returns:
+            list[bytes | bytearray]: STX and length, APDU, CRC (NB only) and ETX
 
-        # Write ETX
-        stream.write(b"\x03")
+        Raises:
+            ValueError: If APDU is too large
+        """
+        apdu_data = self.apdu.to_bytes()
+        apdu_len = len(apdu_data)
+        if apdu_len > 0xFFFF:
+            raise ValueError(f"APDU too large: {apdu_len} bytes")
 
-    def to_bytes(self) -> bytes:
-        """Convert NSDU to bytes
+        head = b"\x02" + _UINT16.pack(apdu_len)
+        if self.network != NetworkType.NB:
+            return [head, apdu_data, b"\x03"]
 
-        Returns:
-            bytes: NSDU as bytes
-        """
-        stream = BytesIO()
-        self.write(stream)
-        stream.seek(0)
-        return stream.read()
+        # Calculate CRC-16 (Length + Data)
+        crc = zlib.crc32(apdu_data, zlib.crc32(head[1:])) & 0xFFFF
+        return [head, apdu_data, _UINT16.pack(crc) + b"\x03"]
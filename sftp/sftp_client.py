@@ -1,8 +1,9 @@
 import asyncio
 import logging
 from dataclasses import dataclass
-from io import BytesIO
+import mmap
 from os import path
+import socket
 from typing import Self
 
 from .file_operation_type import FileOperationType
@@ -24,14 +25,23 @@ class SftpConfig:
     port: int
     timeout: float = 5.0
     network: NetworkType = NetworkType.BB
+    chunk_size: int = 0xFF8  # F_DATA payload size for uploads
+    socket_buffer_size: int | None = None  # SO_SNDBUF/SO_RCVBUF, None for OS default
 
 
 class SftpClient:
     """Async SFTP client implementation"""
 
-    __DATA_CHUNK_SIZE = 0xFF8
+    # The NSDU length field is 16-bit and also covers the 4-byte APDU header
+    MAX_CHUNK_SIZE = 0xFFFF - 4
+    # Number of F_DATA chunks queued between drains during upload
+    UPLOAD_DRAIN_INTERVAL = 16
+    # Size of the batches download writes to disk outside the event loop
+    DOWNLOAD_WRITE_SIZE = 1 << 20
 
     def __init__(self, config: SftpConfig) -> None:
+        if not 0 < config.chunk_size <= self.MAX_CHUNK_SIZE:
+            raise ValueError(f"Invalid chunk size: {config.chunk_size}")
         self._config = config
         self._reader: asyncio.StreamReader | None = None
         self._writer: asyncio.StreamWriter | None = None
@@ -50,6 +60,22 @@ class SftpClient:
                 asyncio.open_connection(self._config.host, self._config.port),
                 timeout=self._config.timeout,
             )
+            # APDUs are exchanged in lockstep with the server, so never hold
+            # them back for Nagle's algorithm
+            sock = self._writer.get_extra_info("socket")
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                if self._config.socket_buffer_size is not None:
+                    sock.setsockopt(
+                        socket.SOL_SOCKET,
+                        socket.SO_SNDBUF,
+                        self._config.socket_buffer_size,
+                    )
+                    sock.setsockopt(
+                        socket.SOL_SOCKET,
+                        socket.SO_RCVBUF,
+                        self._config.socket_buffer_size,
+                    )
             logger.debug("TCP connection established")
         except asyncio.TimeoutError:
             logger.error(
@@ -121,11 +147,12 @@ class SftpClient:
                 self._writer = None
                 self._reader = None
 
-    async def send(self, apdu: ApduBase) -> bool:
+    async def send(self, apdu: ApduBase, drain: bool = True) -> bool:
         """Send APDU to the server
 
         Args:
             apdu: APDU to send
+            drain: Wait for the write buffer to drain, False to queue the APDU
 
         Returns:
             Success flag indicating if the send operation was successful
@@ -137,8 +164,9 @@ class SftpClient:
         try:
             # Create and send NSDU
             nsdu = Nsdu(apdu=apdu)
-            self._writer.write(nsdu.to_bytes())
-            await self._writer.drain()
+            self._writer.writelines(nsdu.to_parts())
+            if drain:
+                await self._writer.drain()
             if isinstance(apdu, GenericApdu):
                 logger.debug("Sent APDU: %s", apdu.type.name)
             elif isinstance(apdu, FDataApdu):
@@ -163,48 +191,31 @@ class SftpClient:
             raise ConnectionError("Not connected")
 
         try:
-            # Read STX (0x02)
-            stx = await self._reader.read(1)
-            if not stx or stx[0] != 0x02:
+            # Read STX (0x02) and length (2 bytes) in one call
+            header = await self._reader.readexactly(3)
+            if header[0] != 0x02:
                 logger.error("Invalid STX received")
                 return False, None
-
-            # Read length (2 bytes)
-            length_bytes = await self._reader.readexactly(2)
-            apdu_len = int.from_bytes(length_bytes, "big")
+            apdu_len = int.from_bytes(header[1:3], "big")
             logger.debug("APDU data length: %d bytes", apdu_len)
 
-            # Read APDU data
-            apdu_data = await self._reader.readexactly(apdu_len)
-
-            # Read potential CRC (2 bytes) and ETX
-            if self._config.network == NetworkType.NB:
-                crc = await self._reader.readexactly(2)
-
-            etx = await self._reader.readexactly(1)
-            if etx[0] != 0x03:
+            # Read APDU data, potential CRC (2 bytes) and ETX in one call
+            tail_len = 3 if self._config.network == NetworkType.NB else 1
+            body = await self._reader.readexactly(apdu_len + tail_len)
+            if body[-1] != 0x03:
                 logger.error("Invalid ETX received")
                 return False, None
 
-            # Create response stream
-            stream = BytesIO()
-            stream.write(stx)
-            stream.write(length_bytes)
-            stream.write(apdu_data)
-            if self._config.network == NetworkType.NB:
-                stream.write(crc)
-            stream.write(etx)
-            stream.seek(0)
-
             # Parse response NSDU
             try:
-                response = Nsdu.read(stream)
-                if isinstance(response.apdu, GenericApdu):
-                    logger.debug("Received Generic APDU: %s", response.apdu.type)
-                elif isinstance(response.apdu, FDataApdu):
-                    logger.debug(
-                        "Received F_DATA APDU: %d bytes", len(response.apdu.data)
-                    )
+                response = Nsdu.from_bytes(header + body, self._config.network)
+                if logger.isEnabledFor(logging.DEBUG):
+                    if isinstance(response.apdu, GenericApdu):
+                        logger.debug("Received Generic APDU: %s", response.apdu.type)
+                    elif isinstance(response.apdu, FDataApdu):
+                        logger.debug(
+                            "Received F_DATA APDU: %d bytes", len(response.apdu.data)
+                        )
                 return True, response.apdu
             except ValueError as e:
                 logger.error("NSDU parsing error: %s", str(e))
@@ -321,39 +332,59 @@ class SftpClient:
             logger.debug("Expected file size: %d bytes", expected_size)
 
         downloaded_size = 0
+        # Chunks are collected into batches that are written in the background
+        # while the next batch is received; at most one write is in flight
+        loop = asyncio.get_running_loop()
+        pending_write: asyncio.Future[int] | None = None
+        batch = bytearray()
         with open(dest_path, "wb") as dest_file:
-            while True:
-                _, response = await self.receive()
-                if not isinstance(response, GenericApdu) and not isinstance(
-                    response, FDataApdu
-                ):
-                    logger.error("Invalid SFTP message received")
-                    raise ValueError("Invalid SFTP message received.")
-
-                if isinstance(response, GenericApdu):
-                    if response.type == ApduType.F_FINAL:
-                        # Finish
-                        break
-
-                    logger.error("Unexpected APDU received: %s", response.type)
-                    raise ValueError("Unexpected APDU received.")
-
-                data_size = len(response.data)
-                downloaded_size += data_size
-                dest_file.write(response.data)
-                if expected_size is None:
-                    logger.debug(
-                        "Received data chunk: %d bytes (Total: %d)",
-                        data_size,
-                        downloaded_size,
-                    )
-                else:
-                    logger.debug(
-                        "Received data chunk: %d bytes (Total: %d/%d)",
-                        data_size,
-                        downloaded_size,
-                        expected_size,
-                    )
+            try:
+                while True:
+                    _, response = await self.receive()
+                    # F_DATA is checked first, it is nearly every message
+                    if type(response) is not FDataApdu:
+                        if not isinstance(response, GenericApdu):
+                            logger.error("Invalid SFTP message received")
+                            raise ValueError("Invalid SFTP message received.")
+
+                        if response.type == ApduType.F_FINAL:
+                            # Finish
+                            break
+
+                        logger.error("Unexpected APDU received: %s", response.type)
+                        raise ValueError("Unexpected APDU received.")
+
+                    data_size = len(response.data)
+                    downloaded_size += data_size
+                    batch += response.data
+                    if len(batch) >= self.DOWNLOAD_WRITE_SIZE:
+                        if pending_write is not None:
+                            await pending_write
+                        pending_write = loop.run_in_executor(
+                            None, dest_file.write, batch
+                        )
+                        batch = bytearray()
+                    if logger.isEnabledFor(logging.DEBUG):
+                        if expected_size is None:
+                            logger.debug(
+                                "Received data chunk: %d bytes (Total: %d)",
+                                data_size,
+                                downloaded_size,
+                            )
+                        else:
+                            logger.debug(
+                                "Received data chunk: %d bytes (Total: %d/%d)",
+                                data_size,
+                                downloaded_size,
+                                expected_size,
+                            )
+            finally:
+                if pending_write is not None:
+                    await pending_write
+
+            # Write the last partial batch
+            if batch:
+                await loop.run_in_executor(None, dest_file.write, batch)
 
         # F_END
         logger.debug("Sending F_END")
@@ -411,25 +442,55 @@ class SftpClient:
             raise ValueError("EXPECT_FILE_SIZE mismatch.")
 
         uploaded_size = 0
-        with open(src_path, "rb") as src_file:
-            while True:
-                buffer = src_file.read(self.__DATA_CHUNK_SIZE)
-                if len(buffer) == 0:
-                    break
-                # F_DATA
-                data_size = len(buffer)
-                uploaded_size += data_size
-                logger.debug(
-                    "Sending data chunk: %d bytes (Total: %d/%d)",
-                    data_size,
-                    uploaded_size,
-                    file_size,
-                )
-
-                result = await self.send(FDataApdu(buffer))
-                if not result:
-                    logger.error("F_DATA sending failed")
-                    raise RuntimeError("F_DATA sending failed.")
+        chunk_size = self._config.chunk_size
+        # An empty file cannot be mapped and has no F_DATA to send
+        if file_size:
+            # Chunks are sliced out of a read-only mapping of the file
+            with (
+                open(src_path, "rb") as src_file,
+                mmap.mmap(src_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped,
+                memoryview(mapped) as view,
+            ):
+                mapped_size = len(view)
+                for index, offset in enumerate(range(0, mapped_size, chunk_size)):
+                    # Each chunk view is released so the mapping can be closed
+                    with view[offset : offset + chunk_size] as buffer:
+                        # F_DATA
+                        data_size = len(buffer)
+                        uploaded_size += data_size
+                        logger.debug(
+                            "Sending data chunk: %d bytes (Total: %d/%d)",
+                            data_size,
+                            uploaded_size,
+                            file_size,
+                        )
+
+                        # Drain every few chunks and after the last one
+                        drain = (
+                            index % self.UPLOAD_DRAIN_INTERVAL
+                            == self.UPLOAD_DRAIN_INTERVAL - 1
+                            or offset + data_size >= mapped_size
+                        )
+
+                        # Have the kernel read the next chunks ahead while
+                        # this batch drains
+                        ahead = offset + data_size
+                        if (
+                            drain
+                            and ahead < mapped_size
+                            and hasattr(mmap, "MADV_WILLNEED")
+                        ):
+                            ahead -= ahead % mmap.PAGESIZE
+                            mapped.madvise(
+                                mmap.MADV_WILLNEED,
+                                ahead,
+                                self.UPLOAD_DRAIN_INTERVAL * chunk_size + mmap.PAGESIZE,
+                            )
+
+                        result = await self.send(FDataApdu(buffer), drain=drain)
+                        if not result:
+                            logger.error("F_DATA sending failed")
+                            raise RuntimeError("F_DATA sending failed.")
 
         # F_FINAL
         logger.debug("Sending F_FINAL")
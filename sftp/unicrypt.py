@@ -1,9 +1,22 @@
+from functools import lru_cache
+from typing import Final
 import unittest
 from unittest.mock import patch
 
-from .bit_operations import count_set_bits, reverse_bits, rotate_bits
+from .bit_operations import count_set_bits, reverse_bits
 from .unicrypt_sbox import UNICRYPT_SBOX
 
+# S-BOX as bytes, for slicing key streams out of it
+_SBOX_BYTES: Final[bytes] = bytes(UNICRYPT_SBOX)
+
+
+@lru_cache(maxsize=1024)
+def _key_stream(start: int, length: int) -> int:
+    # length S-BOX bytes from start, wrapping around, as one integer; there
+    # are only 0x100 starts for each length
+    stream = _SBOX_BYTES[start:] + _SBOX_BYTES * (length // 0x100 + 1)
+    return int.from_bytes(stream[:length], "big")
+
 
 class Unicrypt:
     def __init__(self) -> None:
@@ -14,25 +27,31 @@ class Unicrypt:
         self.sbox_index = (self.sbox_index + 1) % 0x100
         return sbox
 
+    def __key_stream(self, length: int) -> int:
+        # Next length S-BOX bytes as one integer, as get_sbox() would yield them
+        start = self.sbox_index
+        self.sbox_index = (start + length) % 0x100
+        return _key_stream(start, length)
+
     def __round(self, plaintext: bytearray) -> bytearray:
-        temp = plaintext.copy()
+        # Steps 1 to 3 work on the buffer as one big-endian integer
+        length = len(plaintext)
+        n_bits = length * 8
+        if not n_bits:
+            return bytearray()
 
         # Step 1: XOR with the table
-        for i in range(len(temp)):
-            temp[i] ^= self.get_sbox()
+        value = int.from_bytes(plaintext, "big") ^ self.__key_stream(length)
 
         # Step 2: Rotate bits
-        n_set_bits = count_set_bits(temp)
-        temp = rotate_bits(temp, n_set_bits)
+        count = value.bit_count() % n_bits
+        value = ((value << count) | (value >> (n_bits - count))) & ((1 << n_bits) - 1)
 
         # Step 3: XOR with the table
-        for i in range(len(temp)):
-            temp[i] ^= self.get_sbox()
+        value ^= self.__key_stream(length)
 
         # Step 4: Reverse bits in byte
-        temp = reverse_bits(temp)
-
-        return temp
+        return reverse_bits(value.to_bytes(length, "big"))
 
     def encrypt(self, plaintext: bytes):
         self.sbox_index = count_set_bits(plaintext) % 0x100
@@ -100,11 +119,17 @@ class TestUnicrypt(unittest.TestCase):
     def test_round_transformation(self):
         """Test internal round transformation"""
         test_input = bytearray(b"Test")
-        with patch.object(Unicrypt, "get_sbox", return_value=0x42):
+        # Every S-BOX byte reads as 0x42
+        with patch(
+            f"{__name__}._key_stream",
+            side_effect=lambda start, length: int.from_bytes(b"\x42" * length, "big"),
+        ) as key_stream:
             result = self.unicrypt._Unicrypt__round(test_input)
             self.assertIsInstance(result, bytearray)
-            self.assertEqual(len(result), len(test_input))
-            self.assertNotEqual(result, test_input)  # Round should modify the input
+            self.assertEqual(result, bytearray(b"q\xf0\xe3\xd3"))
+            # One key stream for each XOR step, read consecutively
+            self.assertEqual(key_stream.call_count, 2)
+            self.assertEqual(self.unicrypt.sbox_index, 2 * len(test_input))
 
     def test_sbox_index_initialization(self):
         """Test sbox_index initialization in encrypt method"""